@@ -1,4 +1,5 @@
 call .\venv.\Scripts.\Activate
 SET PORT=8080
+SET WEB_THREADS=16
 python app.py
 pause
\ No newline at end of file
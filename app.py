@@ -1,13 +1,24 @@
 from __future__ import annotations
 
 import os
+import signal
+from datetime import datetime, timedelta
+from html import escape
 from pathlib import Path
-from urllib.parse import urlencode
 
-import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from flask import Flask, render_template, request
+from flask import Flask, Response, abort, jsonify, render_template, request, url_for
+
+from goldenott import metrics
+from goldenott.accounts import parse_accounts
+from goldenott.batch import BatchRow, decode_rows, parse_rows, run_batch, to_json_line
+from goldenott.breaker import CircuitBreaker
+from goldenott.client import GoldenOTT
+from goldenott.dedup import create_key
+from goldenott.jobs import JobStore
+from goldenott.ledger import Ledger
+from goldenott.names import UsernameIndex
+from goldenott.scan import CreateOutcome, username_taken
 
 # -----------------------------------------------------------------------------
 # configuration ---------------------------------------------------------------
@@ -17,146 +28,113 @@ load_dotenv(BASE_DIR / ".env")
 
 RESELLER_USERNAME = os.getenv("GOLDENOTT_USERNAME")
 RESELLER_PASSWORD = os.getenv("GOLDENOTT_PASSWORD")
-if not (RESELLER_USERNAME and RESELLER_PASSWORD):
-    raise RuntimeError("GOLDENOTT_USERNAME / GOLDENOTT_PASSWORD missing in .env")
+ACCOUNTS = parse_accounts(os.getenv("GOLDENOTT_ACCOUNTS"), RESELLER_USERNAME, RESELLER_PASSWORD)
+if not ACCOUNTS:
+    raise RuntimeError("GOLDENOTT_ACCOUNTS or GOLDENOTT_USERNAME / GOLDENOTT_PASSWORD missing in .env")
+ACCOUNT_COOLDOWN = float(os.getenv("ACCOUNT_COOLDOWN", "300"))    # ejected accounts rest this long
+
+HOST = os.getenv("HOST", "127.0.0.1")
+PORT = int(os.getenv("PORT", "5000"))
+WEB_SERVER = os.getenv("WEB_SERVER", "waitress")      # "waitress" (production) or "dev"
+WEB_THREADS = int(os.getenv("WEB_THREADS", "16"))     # request threads; creates run on CREATE_WORKERS
+
+BASE_URL = os.getenv("GOLDENOTT_BASE_URL", "https://goldenott.net").rstrip("/")
+POOL_SIZE = int(os.getenv("GOLDENOTT_POOL_SIZE", "4"))               # sessions per account
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", str(POOL_SIZE * len(ACCOUNTS))))
+BATCH_MAX_ROWS = int(os.getenv("BATCH_MAX_ROWS", "1000"))
+CREATE_WORKERS = int(os.getenv("CREATE_WORKERS", str(POOL_SIZE * len(ACCOUNTS))))
+JOB_TTL = float(os.getenv("JOB_TTL", "600"))
+# a held status request ties up a WEB_THREADS thread, so holds stay short and
+# pages poll: WEB_THREADS only needs to cover requests, not pending jobs
+JOB_WAIT_MAX = 2.0          # longest a /jobs/<id>?wait=… long-poll or an SSE connection may hold
+SSE_RETRY_MS = 1000         # EventSource reconnect delay once a connection is closed
+DEDUP_TTL = float(os.getenv("DEDUP_TTL", "300"))     # replay finished creates this long
+USERNAME_INDEX = os.getenv("USERNAME_INDEX", str(BASE_DIR / "usernames.txt"))
+LEDGER_DB = os.getenv("LEDGER_DB", str(BASE_DIR / "lines.db"))
+LINES_PAGE_MAX = 200
+LIMITER_DB = os.getenv("LIMITER_DB", str(BASE_DIR / "upstream.db"))   # shared with bot.py
+MAX_INFLIGHT = float(os.getenv("UPSTREAM_MAX_INFLIGHT", "32"))
+UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", "2"))
 
 # -----------------------------------------------------------------------------
-# bouquet constants (unchanged) -----------------------------------------------
-# -----------------------------------------------------------------------------
-BOUQUET_LIVE = [
-    "1393", "1357", "1374", "1356", "1353", "1355", "1369", "1354", "1373", "580",
-    "1364", "1394", "119", "115", "1331", "118", "1454", "120", "117", "116", "217",
-    "561", "650", "1313", "272", "560", "1316", "1317", "1314", "1322", "1385",
-    "1321", "1315", "1319", "1323", "574", "12", "16", "563", "15", "1375", "19",
-    "26", "1398", "73", "509", "508", "511", "516", "510", "512", "562", "525",
-    "513", "514", "270", "517", "518", "520", "1384", "522", "524", "523", "526",
-    "1372", "528", "1265", "1267", "1266", "273", "1269", "1268", "1270", "558",
-    "47", "51", "74", "254", "192", "48", "56", "1469", "1335", "1474", "566",
-    "1336", "1475", "565", "1470", "1337", "1476", "559", "1338", "1477", "1472",
-    "1473", "1471", "809", "1478", "53", "45", "107", "124", "810", "811", "812",
-    "813", "1376", "814", "815", "816", "817", "61", "1303", "1304", "1305", "1306",
-    "1307", "1308", "1351", "1348", "250", "77", "136", "1289", "1332", "164", "25",
-    "78", "79", "267", "1379", "1380", "1378", "1383", "20", "32", "27", "82", "81",
-    "44", "262", "83", "1382", "42", "21", "22", "23", "28", "35", "24", "76", "31",
-    "29", "30", "40", "86", "38", "33", "37", "39", "41", "36", "34", "43", "1287",
-    "1278", "1284", "1279", "1280", "1281", "1283", "1285", "1282", "1392", "1286",
-    "556", "139", "137", "228", "227", "138", "226", "229", "230", "231", "232",
-    "567", "140", "245", "242", "244", "234", "233", "1387", "274", "241", "141",
-    "240", "238", "237", "239", "235", "236", "1377", "269", "268", "243", "249",
-    "247", "248", "80", "218", "555", "590", "557", "187", "564", "145", "65",
-    "220", "57", "1294", "1295", "1296", "1297", "1298", "1299", "1300", "50", "58",
-    "596", "54", "104", "607", "100", "109", "89", "64", "1310", "1386", "579",
-    "588", "1349", "594"
-]
-
-BOUQUET_VOD = [
-    "1358", "1368", "1365", "1367", "1366", "1242", "103", "193", "179", "180",
-    "913", "185", "256", "259", "904", "897", "922", "902", "896", "901", "920",
-    "923", "895", "928", "921", "903", "910", "1311", "911", "898", "912", "571",
-    "111", "94", "189", "215", "263", "257", "260", "884", "877", "863", "879",
-    "864", "876", "872", "1291", "889", "880", "891", "881", "888", "883", "585",
-    "870", "885", "875", "882", "862", "1453", "101", "110", "587", "186", "106",
-    "586", "1389", "184", "1391", "1460", "1388", "191", "190", "1293", "1292",
-    "1464", "1466", "128", "1224", "1226", "188", "125", "72", "71", "99", "1423",
-    "1462", "1438", "1437", "1441", "1442", "1449", "1452", "1440", "1424", "1428",
-    "1429", "1463", "264", "1433", "1431", "1468", "1430", "1434", "1432", "1435",
-    "1450", "1436", "1448", "1443", "1444", "1446", "1447", "108", "1220", "68",
-    "112", "1129", "575", "576", "577", "578", "163", "1264", "1261", "1260",
-    "1262", "221", "223", "529", "595", "1231", "1230", "1233", "1228", "1232",
-    "1234", "166", "178", "175", "182", "167", "651", "658", "666", "222", "1344",
-    "1347", "1390", "659", "1345", "1346", "664", "1399", "174", "168", "531",
-    "584", "568", "1465", "532", "573", "252", "214", "581", "173", "169", "572",
-    "171", "1312", "172", "181", "1455", "1456", "1457", "1458", "1459", "1326",
-    "1327", "1328", "1329", "1330", "277", "278", "279", "280", "281", "266",
-    "251", "170", "161", "597", "253", "801", "799", "800", "533", "582", "794"
-]
-
-# -----------------------------------------------------------------------------
-# low‑level helpers -----------------------------------------------------------
-# -----------------------------------------------------------------------------
-
-def login(session: requests.Session) -> None:
-    r = session.get("https://goldenott.net/")
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
-    token_inp = soup.select_one('input[name="_csrf_token"]')
-    if not token_inp:
-        raise RuntimeError("Login CSRF token not found")
-    payload = {
-        "_username": RESELLER_USERNAME,
-        "_password": RESELLER_PASSWORD,
-        "_csrf_token": token_inp["value"],
-    }
-    r = session.post("https://goldenott.net/", data=payload, allow_redirects=True)
-    r.raise_for_status()
-    if "Dashboard" not in r.text and "Logout" not in r.text:
-        raise RuntimeError("Login failed – still on login page")
-
-
-def fetch_create_token(session: requests.Session) -> str:
-    r = session.get("https://goldenott.net/reseller/m3u/new")
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
-    token_inp = soup.select_one('input[name="m3u[_token]"]')
-    if not token_inp:
-        raise RuntimeError("Create-form CSRF token not found")
-    return token_inp["value"]
-
-
-def build_payload(form_csrf: str,
-                  user: str,
-                  passwd: str,
-                  adult_flag: str,
-                  forced_country: str) -> list[tuple[str, str]]:
-    """Return list-of-tuples payload mirroring the order that worked in the
-    first proven‑good version (forcedCountry **always present**, _token last)."""
-
-    pairs: list[tuple[str, str]] = [
-        ("m3u[username]",      user),
-        ("m3u[id]",            ""),          # empty == new user
-        ("m3u[password]",      passwd),
-        ("m3u[period]",        "1"),
-        ("m3u[fullName]",      ""),
-        ("m3u[email]",         ""),
-        ("m3u[phone]",         ""),
-        ("m3u[note]",          ""),
-        ("m3u[forcedCountry]", forced_country),  # always include, "" for Auto, "ALL" for VPN
-        ("m3u[adult]",         adult_flag),
-        ("m3u[_token]",        form_csrf),       # keep _token last like the browser does
-    ]
-
-    pairs.extend(("m3u[bouquetLive][]", b) for b in BOUQUET_LIVE)
-    pairs.extend(("m3u[bouquetVod][]",  v) for v in BOUQUET_VOD)
-    return pairs
-
-
-# -----------------------------------------------------------------------------
-# single reusable helper  -----------------------------------------------------
+# create flow (goldenott.client) ----------------------------------------------
 # -----------------------------------------------------------------------------
 
 def goldenott_create(username: str,
                      password: str,
                      adult_flag: str,
-                     forced_country: str | None) -> str:
-    """Full flow but returns raw HTML for caller (Flask route or bot)."""
-    with requests.Session() as sess:
-        login(sess)
-        form_token = fetch_create_token(sess)
-        data = build_payload(form_token, username, password, adult_flag, forced_country)
-
-        # ---- diagnostic: forced-country & encoded size -------------------
-        encoded = urlencode(data, doseq=True)
-        print("[DEBUG] FORCED=", forced_country, "POST SIZE=", len(encoded))
-        # -----------------------------------------------------------------
-
-        r = sess.post(
-            "https://goldenott.net/reseller/m3u/new",
-            data=data,
-            headers={"Referer": "https://goldenott.net/reseller/m3u/new"},
-            allow_redirects=True,
-        )
-        r.raise_for_status()
-        return r.text
+                     forced_country: str | None) -> CreateOutcome:
+    """Full flow; returns the classified outcome for the caller (Flask route
+    or batch).  Identical requests share one upstream call and a finished
+    outcome is replayed for DEDUP_TTL seconds."""
+    outcome = GOLDENOTT.create(username, password, adult_flag, forced_country)
+    if outcome.ok or username_taken(outcome.message):
+        TAKEN.add(username)
+    return outcome
+
+
+BREAKER = CircuitBreaker(f"{BASE_URL}/")
+LEDGER = Ledger(LEDGER_DB)
+GOLDENOTT = GoldenOTT(
+    ACCOUNTS,
+    base_url=BASE_URL,
+    pool_size=POOL_SIZE,
+    limiter_db=LIMITER_DB,
+    max_inflight=MAX_INFLIGHT,
+    retries=UPSTREAM_RETRIES,
+    breaker=BREAKER,
+    dedup_ttl=DEDUP_TTL,
+    ledger=LEDGER,
+    cooldown=ACCOUNT_COOLDOWN,
+)
+TAKEN = UsernameIndex(USERNAME_INDEX)
+JOBS = JobStore(workers=CREATE_WORKERS, ttl=JOB_TTL)
+
+
+def valid_username(user: str) -> bool:
+    return user.isalnum() and len(user) >= 7
+
+
+def known_taken(username: str,
+                password: str,
+                adult_flag: str,
+                forced_country: str | None) -> bool:
+    """Name is in the local index – unless this exact request is in flight or
+    still replayable, in which case the repeat gets the original answer."""
+    return (username in TAKEN
+            and create_key(username, password, adult_flag, forced_country) not in GOLDENOTT)
+
+
+def create_row(row: BatchRow) -> dict:
+    """One batch row → ``{"ok": bool, "message": str}`` (used by /create/batch
+    and batch.py)."""
+    if not valid_username(row.username):
+        return {"ok": False, "message": "Invalid username"}
+    if known_taken(row.username, row.password, row.adult_flag, row.forced_country):
+        return {"ok": False, "message": "Username already taken"}
+    outcome = goldenott_create(row.username, row.password, row.adult_flag, row.forced_country)
+    return {"ok": outcome.ok, "message": outcome.message}
+
+
+def create_job(user: str, passwd: str, adult: str, fc_choice: str) -> dict:
+    """Body of a queued /create job; the dict becomes the job's result."""
+    forced_country = "" if fc_choice == "Auto" else "ALL"
+    outcome = goldenott_create(user, passwd, adult, forced_country)
+    return {
+        "username": user,
+        "adult": adult == "1",
+        "forced_country": fc_choice,
+        "ok": outcome.ok,
+        "message": outcome.message,
+    }
+
+
+def job_json(job) -> dict:
+    return {
+        **job.to_dict(),
+        "status_url": url_for("job_status", job_id=job.id),
+        "events_url": url_for("job_events", job_id=job.id),
+    }
 
 # -----------------------------------------------------------------------------
 # Flask web UI ----------------------------------------------------------------
@@ -169,13 +147,23 @@ def form():
     return render_template("form.html")
 
 
+@app.route("/metrics")
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
 @app.route("/create", methods=["POST"])
 def create():
+    """Queue the create and answer straight away with the job id; the result
+    comes from ``/jobs/<id>`` (poll / long-poll) or ``/jobs/<id>/events``."""
+    wants_json = request.accept_mimetypes.best == "application/json"
     user = request.form["username"].strip()
     passwd = request.form["password"].strip()
 
     # --- username validation ------------------------------------------------
-    if not (user.isalnum() and len(user) >= 7):
+    if not valid_username(user):
+        if wants_json:
+            return jsonify(error="Invalid username"), 400
         return (
             "<h3 style='color:red'>❌ Invalid username</h3>"
             "<p>Username must be at least 7 characters and contain only letters and numbers.</p>"
@@ -184,35 +172,146 @@ def create():
 
     adult = "1" if "adult" in request.form else "0"
     fc_choice = request.form.get("forced_country", "Auto")
-    forced_country = "" if fc_choice == "Auto" else "ALL"
-
-    try:
-        html_response = goldenott_create(user, passwd, adult, forced_country)
-
-                # ---- heuristic: check for a *real* alert-danger div --------------
-        from bs4 import BeautifulSoup as _Bs
-
-        soup = _Bs(html_response, "html.parser")
-        err_div = soup.select_one("div.alert-danger")
-        if err_div:
-            snippet = str(err_div).replace("<", "&lt;")
-            return (
-                "<h3 style='color:red'>❌ GoldenOTT error</h3>"
-                f"<pre>{snippet}</pre>"
-            )
-        # ------------------------------------------------------------------
-
-        snippet = html_response.replace("<", "&lt;")[:3000]
+    if known_taken(user, passwd, adult, "" if fc_choice == "Auto" else "ALL"):
+        if wants_json:
+            return jsonify(error="Username already taken"), 409
         return (
-            "<h3 style='color:green'>🟢 GoldenOTT replied</h3>"
-            "<pre style='white-space:pre-wrap;max-height:600px;overflow-y:auto;"
-            "border:1px solid #aaa;padding:.6rem'>"
-            f"{snippet}\n\n…trimmed…</pre>"
+            "<h3 style='color:red'>❌ Username already taken</h3>"
+            "<p>Pick another username.</p>"
         )
-    except Exception as exc:
-        return f"<h3>❌ Error</h3><pre>{exc}</pre>"
+
+    try:
+        BREAKER.check()                    # don't queue work during an outage
+        job = JOBS.submit(create_job, user, passwd, adult, fc_choice)
+    except RuntimeError as exc:            # upstream unavailable / executor shut down
+        if wants_json:
+            return jsonify(error=str(exc)), 503
+        return f"<h3>❌ Error</h3><pre>{escape(str(exc))}</pre>", 503
+
+    status_url = url_for("job_status", job_id=job.id)
+    if wants_json:
+        return jsonify(job_json(job)), 202, {"Location": status_url}
+    return render_template("job.html", job=job, status_url=status_url), 202
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id: str):
+    """Job state as JSON; ``?wait=N`` holds the request up to N seconds
+    (capped at JOB_WAIT_MAX) for the job to finish."""
+    job = JOBS.get(job_id) or abort(404)
+    wait = min(request.args.get("wait", 0.0, type=float), JOB_WAIT_MAX)
+    if wait > 0:
+        job.wait(wait)
+    return jsonify(job_json(job))
+
+
+@app.route("/jobs/<job_id>/events")
+def job_events(job_id: str):
+    """Server-Sent Events: one ``status`` event now, then a ``done`` event
+    carrying the finished job.  A connection is held at most JOB_WAIT_MAX;
+    if the job is still running it ends with a ``retry:`` hint and the
+    EventSource reconnects."""
+    job = JOBS.get(job_id) or abort(404)
+
+    def events():
+        yield f"event: status\ndata: {to_json_line(job.to_dict())}\n"
+        if job.wait(JOB_WAIT_MAX):
+            yield f"event: done\ndata: {to_json_line(job.to_dict())}\n"
+        else:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/lines")
+def lines():
+    """Ledger of creates, newest first.  ``?user=`` filters on a username,
+    ``?day=YYYY-MM-DD`` on a (local) day, ``?before=<id>`` pages on."""
+    limit = max(1, min(request.args.get("limit", 50, type=int), LINES_PAGE_MAX))
+    before = request.args.get("before", type=int)
+    user = request.args.get("user", "").strip()
+    day = request.args.get("day", "").strip()
+    since = until = None
+    if day:
+        try:
+            start = datetime.strptime(day, "%Y-%m-%d")
+        except ValueError:
+            return jsonify(error="day must be YYYY-MM-DD"), 400
+        since, until = start.timestamp(), (start + timedelta(days=1)).timestamp()
+
+    rows = LEDGER.lines(before=before, limit=limit, username=user or None,
+                        since=since, until=until)
+    next_before = rows[-1]["id"] if len(rows) == limit else None
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify(lines=rows, next_before=next_before)
+    for row in rows:
+        row["when"] = datetime.fromtimestamp(row["created_at"]).strftime("%Y-%m-%d %H:%M:%S")
+    return render_template("lines.html", rows=rows, user=user, day=day,
+                           limit=limit, next_before=next_before)
+
+
+@app.route("/create/batch", methods=["POST"])
+def create_batch():
+    """CSV or JSON rows in (body or a ``file`` upload), NDJSON results out –
+    one line per row, streamed as each create finishes."""
+    upload = request.files.get("file")
+    if upload is not None:
+        fmt = "json" if (upload.filename or "").lower().endswith(".json") else "csv"
+    else:
+        fmt = "json" if request.is_json else "csv"
+    fmt = request.args.get("format", fmt)
+
+    try:
+        data = upload.read() if upload is not None else request.get_data()
+        rows = parse_rows(decode_rows(data), fmt)
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
+    if not rows:
+        return jsonify(error="batch is empty"), 400
+    if len(rows) > BATCH_MAX_ROWS:
+        return jsonify(error=f"batch too large ({len(rows)} > {BATCH_MAX_ROWS} rows)"), 400
+
+    results = (to_json_line(r) for r in run_batch(rows, create_row, workers=BATCH_WORKERS))
+    return Response(results, mimetype="application/x-ndjson",
+                    headers={"X-Accel-Buffering": "no"})
+
+
+# -----------------------------------------------------------------------------
+# serving ---------------------------------------------------------------------
+# -----------------------------------------------------------------------------
+
+def _stop(signum, frame) -> None:
+    raise SystemExit(0)          # waitress treats this like Ctrl+C: stops its threads
+
+
+def serve() -> None:
+    """Production server: one process, WEB_THREADS request threads, warm
+    sessions before the first request and a graceful stop on Ctrl+C,
+    Ctrl+Break or SIGTERM (in-flight requests finish, queued creates are
+    completed and the ledger flushed)."""
+    from waitress import create_server     # only the production server needs it
+
+    server = create_server(app, host=HOST, port=PORT, threads=WEB_THREADS, ident="GoldenOTT")
+    signal.signal(signal.SIGTERM, _stop)
+    if hasattr(signal, "SIGBREAK"):             # Windows console
+        signal.signal(signal.SIGBREAK, _stop)
+
+    GOLDENOTT.warm()
+    print(f"Serving on http://{HOST}:{PORT} ({WEB_THREADS} threads, "
+          f"{CREATE_WORKERS} create workers, {len(GOLDENOTT.router)} reseller account(s)) – Ctrl+C to stop.")
+    try:
+        server.run()
+    finally:
+        server.close()
+        print("Stopping – finishing queued creates…")
+        JOBS.shutdown(wait=True)
+        LEDGER.close()
 
 
 if __name__ == "__main__":
-    port = int(os.getenv("PORT", "5000"))
-    app.run(debug=True, port=port)
\ No newline at end of file
+    if WEB_SERVER == "dev":
+        GOLDENOTT.warm()
+        app.run(debug=True, host=HOST, port=PORT)
+    else:
+        serve()
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Command-line twin of ``POST /create/batch``:
+
+    python batch.py rows.csv [--workers 4]
+    python batch.py rows.json
+    type rows.csv | python batch.py - --format csv
+
+Rows need username,password and optionally adult (1/0, yes/no) and
+forced_country (Auto/VPN).  One JSON result per row is printed as soon as
+that row finishes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from app import BATCH_WORKERS, create_row
+from goldenott.batch import decode_rows, parse_rows, run_batch, to_json_line
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Create GoldenOTT lines in bulk.")
+    parser.add_argument("file", help="CSV or JSON file with one row per line ('-' for stdin)")
+    parser.add_argument("--format", choices=("csv", "json"),
+                        help="input format (default: from the file extension, else csv)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS,
+                        help=f"concurrent creates (default {BATCH_WORKERS})")
+    opts = parser.parse_args(argv)
+
+    fmt = opts.format or ("json" if opts.file.lower().endswith(".json") else "csv")
+    try:
+        if opts.file == "-":
+            data = sys.stdin.buffer.read()
+        else:
+            with open(opts.file, "rb") as fh:
+                data = fh.read()
+        rows = parse_rows(decode_rows(data), fmt)
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"{parser.prog}: error: {exc}\n")
+
+    failed = 0
+    for result in run_batch(rows, create_row, workers=opts.workers):
+        failed += not result["ok"]
+        sys.stdout.write(to_json_line(result))
+        sys.stdout.flush()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Benchmark: cold import time of the entry points and the shared package.
+
+Each module is imported in a fresh interpreter (what a supervisor restart or
+a ``python batch.py …`` one-shot pays before doing any work), *-n* times;
+the table shows the median and best wall time of the import itself and the
+heavy third-party packages it dragged in:
+
+    python bench/bench_import.py [-n 15] [module ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULES = ("goldenott", "goldenott.client", "batch", "app", "bot")
+HEAVY = ("requests", "httpx", "flask", "waitress", "telegram", "bs4", "asyncio")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+__import__(sys.argv[1])
+elapsed = time.perf_counter() - start
+heavy = [m for m in sys.argv[2:] if m in sys.modules]
+print(json.dumps([elapsed, heavy]))
+"""
+
+
+def time_import(module: str, env: dict[str, str]) -> tuple[float, list[str]]:
+    out = subprocess.run([sys.executable, "-c", PROBE, module, *HEAVY], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    elapsed, heavy = json.loads(out.splitlines()[-1])
+    return elapsed, heavy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-n", type=int, default=15, help="fresh interpreters per module")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    opts = parser.parse_args()
+
+    scratch = tempfile.mkdtemp()
+    env = {
+        **os.environ,
+        "GOLDENOTT_USERNAME": "bench",
+        "GOLDENOTT_PASSWORD": "bench",
+        "TELEGRAM_TOKEN": "0:bench",
+        "USERNAME_INDEX": os.path.join(scratch, "usernames.txt"),
+        "LEDGER_DB": os.path.join(scratch, "lines.db"),
+        "LIMITER_DB": os.path.join(scratch, "upstream.db"),
+        "STATE_DB": os.path.join(scratch, "state.db"),
+    }
+
+    print(f"{'module':<18s} {'median ms':>10s} {'best ms':>9s}  heavy imports")
+    for module in opts.modules:
+        times, heavy = [], []
+        for _ in range(opts.n):
+            elapsed, heavy = time_import(module, env)
+            times.append(elapsed)
+        print(f"{module:<18s} {statistics.median(times) * 1000:>10.1f} "
+              f"{min(times) * 1000:>9.1f}  {', '.join(heavy) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Offline load benchmark for the two entry points.
+
+Starts the local GoldenOTT stand-in (bench/fake_goldenott.py), points
+app.py / bot.py at it and drives the Flask ``/create`` route (submit, then
+long-poll ``/jobs/<id>``) and the bot's ``got_adult_button`` handler at
+increasing concurrency, reporting p50/p95/p99 latency and creates per second for each level:
+
+    python bench/bench_load.py --target flask --concurrency 1,4,16,64
+    python bench/bench_load.py --target bot --latency 120 --error-rate 0.05
+    python bench/bench_load.py --base-url http://127.0.0.1:8099   # external fake
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "bench"))
+
+from fake_goldenott import FakeConfig, FakeGoldenOTT  # noqa: E402
+
+_names = itertools.count()
+
+
+def next_username() -> str:
+    return f"bench{os.getpid()}x{next(_names):07d}"
+
+
+@dataclass
+class LevelResult:
+    concurrency: int
+    latencies: list[float] = field(default_factory=list)
+    failures: int = 0
+    wall: float = 0.0
+
+    def pct(self, p: float) -> float:
+        data = sorted(self.latencies)
+        if not data:
+            return float("nan")
+        k = min(len(data) - 1, max(0, round(p / 100 * len(data)) - 1))
+        return data[k] * 1000
+
+    def row(self) -> str:
+        ok = len(self.latencies) - self.failures
+        return (f"{self.concurrency:>6d} {len(self.latencies):>6d} {self.failures:>6d} "
+                f"{self.pct(50):>9.1f} {self.pct(95):>9.1f} {self.pct(99):>9.1f} "
+                f"{statistics.fmean(self.latencies) * 1000 if self.latencies else 0:>9.1f} "
+                f"{ok / self.wall if self.wall else 0:>9.1f}")
+
+
+HEADER = (f"{'conc':>6s} {'reqs':>6s} {'fail':>6s} {'p50 ms':>9s} {'p95 ms':>9s} "
+          f"{'p99 ms':>9s} {'mean ms':>9s} {'creates/s':>9s}")
+
+
+# ----------------------------------------------------------------------
+# Flask /create -------------------------------------------------------
+# ----------------------------------------------------------------------
+def run_flask(levels: list[int], requests_per_level: int, warmup: int) -> list[LevelResult]:
+    import app
+
+    # what `python app.py` does at startup: log the pool in, pre-fetch tokens
+    for tokens in app.GOLDENOTT.router:
+        tokens.pool.warm(each=tokens.prefetch)
+    local = threading.local()
+
+    def one() -> tuple[float, bool]:
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.app.test_client()
+        data = {"username": next_username(), "password": "benchpass", "forced_country": "Auto"}
+        start = time.perf_counter()
+        r = client.post("/create", data=data, headers={"Accept": "application/json"})
+        job = r.get_json(silent=True) or {}
+        # /create only queues the job – long-poll its status until it finishes
+        while r.status_code in (200, 202) and job.get("status") in ("queued", "running"):
+            r = client.get(job["status_url"], query_string={"wait": 30})
+            job = r.get_json(silent=True) or {}
+        elapsed = time.perf_counter() - start
+        ok = job.get("status") == "done" and bool(job["result"]["ok"])
+        return elapsed, ok
+
+    results = []
+    for conc in levels:
+        with ThreadPoolExecutor(max_workers=conc) as pool:
+            list(pool.map(lambda _: one(), range(warmup)))
+            res = LevelResult(conc)
+            start = time.perf_counter()
+            for elapsed, ok in pool.map(lambda _: one(), range(requests_per_level)):
+                res.latencies.append(elapsed)
+                res.failures += not ok
+            res.wall = time.perf_counter() - start
+        results.append(res)
+    return results
+
+
+# ----------------------------------------------------------------------
+# Telegram got_adult_button -------------------------------------------
+# ----------------------------------------------------------------------
+class _Message:
+    def __init__(self) -> None:
+        self.replies: list[str] = []
+
+    async def reply_text(self, text: str, **kwargs) -> None:
+        self.replies.append(text)
+
+
+class _Query:
+    def __init__(self, data: str, chat_id: int) -> None:
+        self.data = data
+        self.message = _Message()
+        self.from_user = SimpleNamespace(id=chat_id)
+
+    async def answer(self, *args, **kwargs) -> None:
+        pass
+
+    async def edit_message_reply_markup(self, *args, **kwargs) -> None:
+        pass
+
+
+def run_bot(levels: list[int], requests_per_level: int, warmup: int) -> list[LevelResult]:
+    import bot
+
+    outcomes: dict[str, bool] = {}
+    real_create = bot.GOLDENOTT.create
+
+    async def create_and_record(username, password, adult_flag, forced_country):
+        outcome = await real_create(username, password, adult_flag, forced_country)
+        outcomes[username] = outcome.ok
+        return outcome
+
+    bot.GOLDENOTT.create = create_and_record
+
+    async def one(chat_id: int) -> tuple[float, bool]:
+        username = next_username()
+        query = _Query("adult_no", chat_id)
+        update = SimpleNamespace(callback_query=query,
+                                 effective_chat=SimpleNamespace(id=chat_id),
+                                 effective_user=query.from_user)
+        context = SimpleNamespace(user_data={"username": username,
+                                             "password": "benchpass",
+                                             "forced_country": ""},
+                                  bot_data={})
+        start = time.perf_counter()
+        await bot.got_adult_button(update, context)
+        return time.perf_counter() - start, outcomes.pop(username, False)
+
+    async def level(conc: int, n: int) -> list[tuple[float, bool]]:
+        sem = asyncio.Semaphore(conc)
+
+        async def gated(i: int) -> tuple[float, bool]:
+            async with sem:
+                return await one(i)
+
+        return await asyncio.gather(*(gated(i) for i in range(n)))
+
+    async def main() -> list[LevelResult]:
+        await bot.GOLDENOTT.warm()      # what post_init does
+        results = []
+        for conc in levels:
+            await level(conc, warmup)
+            res = LevelResult(conc)
+            start = time.perf_counter()
+            for elapsed, ok in await level(conc, requests_per_level):
+                res.latencies.append(elapsed)
+                res.failures += not ok
+            res.wall = time.perf_counter() - start
+            results.append(res)
+        await bot.GOLDENOTT.aclose()
+        return results
+
+    return asyncio.run(main())
+
+
+# ----------------------------------------------------------------------
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load benchmark against a fake GoldenOTT.")
+    parser.add_argument("--target", choices=("flask", "bot"), default="flask")
+    parser.add_argument("--concurrency", default="1,4,16,64",
+                        help="comma-separated concurrency levels (default 1,4,16,64)")
+    parser.add_argument("--requests", type=int, default=200, help="creates per level")
+    parser.add_argument("--warmup", type=int, default=8, help="unmeasured creates before each level")
+    parser.add_argument("--base-url", help="use an already running fake instead of starting one")
+    parser.add_argument("--latency", type=float, default=50.0, help="fake mean latency, ms")
+    parser.add_argument("--jitter", type=float, default=20.0, help="fake latency jitter, ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake alert-danger rate")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fake HTTP 503 rate")
+    parser.add_argument("--accounts", type=int, default=1, help="reseller accounts to shard over")
+    parser.add_argument("--verbose", action="store_true", help="keep the entry points' own prints")
+    opts = parser.parse_args()
+
+    fake = None
+    base_url = opts.base_url
+    if base_url is None:
+        fake = FakeGoldenOTT(FakeConfig(opts.latency, opts.jitter, opts.error_rate, opts.fail_rate))
+        base_url = fake.start()
+
+    os.environ["GOLDENOTT_BASE_URL"] = base_url
+    os.environ.setdefault("GOLDENOTT_USERNAME", "bench")
+    os.environ.setdefault("GOLDENOTT_PASSWORD", "bench")
+    os.environ.setdefault("TELEGRAM_TOKEN", "0:bench")
+    if opts.accounts > 1:
+        os.environ.setdefault("GOLDENOTT_ACCOUNTS",
+                              ",".join(f"bench{i}:bench" for i in range(opts.accounts)))
+    scratch = tempfile.mkdtemp()
+    os.environ.setdefault("USERNAME_INDEX", os.path.join(scratch, "usernames.txt"))
+    os.environ.setdefault("LEDGER_DB", os.path.join(scratch, "lines.db"))
+    os.environ.setdefault("LIMITER_DB", os.path.join(scratch, "upstream.db"))
+
+    levels = [int(c) for c in opts.concurrency.split(",") if c.strip()]
+    run = run_flask if opts.target == "flask" else run_bot
+    quiet = contextlib.nullcontext() if opts.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        results = run(levels, opts.requests, opts.warmup)
+
+    print(f"target={opts.target} upstream={base_url} "
+          f"latency={opts.latency}±{opts.jitter}ms error-rate={opts.error_rate} fail-rate={opts.fail_rate}")
+    print(HEADER)
+    for res in results:
+        print(res.row())
+    if fake is not None:
+        print("upstream:", fake.stats)
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: BeautifulSoup(html.parser) lookups the entry points used to do
+versus goldenott.scan, over the saved pages in bench/samples/.  Both sides
+must agree on every page before anything is timed.
+
+    python bench/bench_parse.py [-n 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from goldenott import scan  # noqa: E402
+
+SAMPLES = Path(__file__).resolve().parent / "samples"
+
+
+def _squash(text: str) -> str:
+    return " ".join(text.split())
+
+
+def with_bs4(html: str) -> tuple:
+    soup = BeautifulSoup(html, "html.parser")
+    login = soup.select_one('input[name="_csrf_token"]')
+    form = soup.select_one('input[name="m3u[_token]"]')
+    err = soup.select_one("div.alert-danger")
+    return (
+        login["value"] if login else None,
+        form["value"] if form else None,
+        _squash(err.get_text(" ", strip=True)) if err else None,
+    )
+
+
+def with_scan(html: str) -> tuple:
+    err = scan.find_alert_danger(html)
+    return (
+        scan.input_value(html, "_csrf_token"),
+        scan.input_value(html, "m3u[_token]"),
+        scan.text_content(err) if err is not None else None,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=50)
+    opts = parser.parse_args()
+
+    pages = {p.name: p.read_text(encoding="utf-8") for p in sorted(SAMPLES.glob("*.html"))}
+    for name, html in pages.items():
+        old, new = with_bs4(html), with_scan(html)
+        assert old == new, f"{name}: bs4 {old!r} != scan {new!r}"
+
+    print(f"{'page':24s} {'size':>8s} {'bs4 µs':>10s} {'scan µs':>10s} {'speed-up':>9s}")
+    for name, html in pages.items():
+        old = min(timeit.repeat(lambda: with_bs4(html), number=opts.number, repeat=3)) / opts.number
+        new = min(timeit.repeat(lambda: with_scan(html), number=opts.number, repeat=3)) / opts.number
+        print(f"{name:24s} {len(html):8d} {old * 1e6:10.1f} {new * 1e6:10.1f} {old / new:8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
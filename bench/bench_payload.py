@@ -0,0 +1,80 @@
+"""
+Micro-benchmark: list-of-tuples payload + double urlencode (old create path)
+versus the pre-encoded PayloadTemplate.
+
+    python bench/bench_payload.py [-n 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from urllib.parse import urlencode
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from goldenott.client import BOUQUET_LIVE, BOUQUET_VOD  # noqa: E402
+from goldenott.payload import PayloadTemplate  # noqa: E402
+
+
+def build_payload(form_csrf: str,
+                  user: str,
+                  passwd: str,
+                  adult_flag: str,
+                  forced_country: str) -> list[tuple[str, str]]:
+    """The per-call list builder app.py and bot.py used to run."""
+    pairs = [
+        ("m3u[username]",      user),
+        ("m3u[id]",            ""),
+        ("m3u[password]",      passwd),
+        ("m3u[period]",        "1"),
+        ("m3u[fullName]",      ""),
+        ("m3u[email]",         ""),
+        ("m3u[phone]",         ""),
+        ("m3u[note]",          ""),
+        ("m3u[forcedCountry]", forced_country),
+        ("m3u[adult]",         adult_flag),
+        ("m3u[_token]",        form_csrf),
+    ]
+    pairs.extend(("m3u[bouquetLive][]", b) for b in BOUQUET_LIVE)
+    pairs.extend(("m3u[bouquetVod][]",  v) for v in BOUQUET_VOD)
+    return pairs
+
+
+ARGS = ("Zx9_token-abc/def+123=", "trialuser42", "p@ss word&1", "1", "ALL")
+
+
+def old_path() -> bytes:
+    data = build_payload(*ARGS)
+    urlencode(data, doseq=True)                        # debug print in app.py
+    return urlencode(data, doseq=True).encode()        # what requests sends
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=20000)
+    opts = parser.parse_args()
+
+    template = PayloadTemplate(BOUQUET_LIVE, BOUQUET_VOD)
+
+    def new_path() -> bytes:
+        return template.encode(*ARGS)
+
+    for args in (ARGS, ("t", "u", "p", "0", ""), ("t", "ü ser", "ä&=+", "0", "ALL")):
+        expected = urlencode(build_payload(*args), doseq=True).encode()
+        assert template.encode(*args) == expected, f"template mismatch for {args!r}"
+
+    print(f"body size: {len(new_path())} bytes, {opts.number} iterations")
+    results = {}
+    for name, fn in (("old (build + 2x urlencode)", old_path), ("new (PayloadTemplate)", new_path)):
+        best = min(timeit.repeat(fn, number=opts.number, repeat=5))
+        results[name] = best
+        print(f"  {name:28s} {best / opts.number * 1e6:8.2f} µs/create")
+    old, new = results.values()
+    print(f"  speed-up: {old / new:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
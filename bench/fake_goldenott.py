@@ -0,0 +1,235 @@
+"""
+Local stand-in for the GoldenOTT reseller panel, for offline benchmarks.
+
+Serves the login form, the dashboard, the ``/reseller/m3u/new`` form with a
+per-session CSRF token and success / alert-danger create responses, built
+from the saved pages in bench/samples/.  Latency and failure rates are
+configurable:
+
+    python bench/fake_goldenott.py --port 8099 --latency 80 --error-rate 0.05
+
+then point an entry point at it with ``GOLDENOTT_BASE_URL=http://127.0.0.1:8099``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+SAMPLES = Path(__file__).resolve().parent / "samples"
+COOKIE = "PHPSESSID"
+
+
+def _template(name: str, field: str) -> tuple[str, str]:
+    """Split a sample page around the value of its *field* hidden input."""
+    html = (SAMPLES / name).read_text(encoding="utf-8")
+    m = re.search(rf'name="{re.escape(field)}" value="([^"]*)"', html)
+    return html[:m.start(1)], html[m.end(1):]
+
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 50.0        # mean added latency per request
+    jitter_ms: float = 20.0         # +/- uniform jitter on top
+    error_rate: float = 0.0         # share of creates answered with alert-danger
+    fail_rate: float = 0.0          # share of requests answered with HTTP 503
+    session_ttl: float = 0.0        # seconds before a login expires (0 = never)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256       # benchmarks open lots of connections at once
+
+    def handle_error(self, request, client_address) -> None:
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return                     # clients hang up once they've read enough
+        super().handle_error(request, client_address)
+
+
+class FakeGoldenOTT:
+    """Threaded fake panel; ``start()`` returns the base URL to point clients at."""
+
+    def __init__(self, config: FakeConfig | None = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeConfig()
+        self.login_page = _template("login.html", "_csrf_token")
+        self.form_page = _template("create_form.html", "m3u[_token]")
+        self.dashboard = (SAMPLES / "dashboard.html").read_text(encoding="utf-8")
+        self.success = (SAMPLES / "create_success.html").read_text(encoding="utf-8")
+        self.taken = (SAMPLES / "create_error.html").read_text(encoding="utf-8")
+        self.csrf_error = (SAMPLES / "create_csrf_error.html").read_text(encoding="utf-8")
+
+        self.sessions: dict[str, dict] = {}     # sid → {"user": .., "token": .., "at": ..}
+        self.usernames: set[str] = set()
+        self.stats = {"logins": 0, "creates": 0, "rejected": 0, "requests": 0}
+        self.lock = threading.Lock()
+
+        handler = type("Handler", (_Handler,), {"fake": self})
+        self.server = _Server((host, port), handler)
+        self.thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self.thread = threading.Thread(target=self.server.serve_forever, name="fake-goldenott", daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    # ------------------------------------------------------------------
+    def session(self, sid: str | None) -> dict | None:
+        with self.lock:
+            sess = self.sessions.get(sid or "")
+            if sess is None:
+                return None
+            ttl = self.config.session_ttl
+            if ttl and time.monotonic() - sess["at"] > ttl:
+                del self.sessions[sid]
+                return None
+            return sess
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fake: FakeGoldenOTT
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def log_message(self, *args) -> None:
+        pass
+
+    # ---- helpers -----------------------------------------------------
+    def _sid(self) -> str | None:
+        for part in self.headers.get("Cookie", "").split(";"):
+            key, _, value = part.strip().partition("=")
+            if key == COOKIE:
+                return value
+        return None
+
+    def _send(self, status: int, body: str = "", headers: dict[str, str] | None = None) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass            # client stopped reading early – that's the point
+
+    def _redirect(self, location: str, headers: dict[str, str] | None = None) -> None:
+        self._send(302, "", {"Location": location, **(headers or {})})
+
+    def _delay_and_maybe_fail(self) -> bool:
+        cfg = self.fake.config
+        with self.fake.lock:
+            self.fake.stats["requests"] += 1
+        delay = cfg.latency_ms + random.uniform(-cfg.jitter_ms, cfg.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if cfg.fail_rate and random.random() < cfg.fail_rate:
+            self._send(503, "<h1>503 Service Unavailable</h1>")
+            return True
+        return False
+
+    def _form(self) -> dict[str, list[str]]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return parse_qs(self.rfile.read(length).decode("utf-8"), keep_blank_values=True)
+
+    # ---- routes ------------------------------------------------------
+    def do_GET(self) -> None:
+        if self._delay_and_maybe_fail():
+            return
+        path = urlsplit(self.path).path
+        sess = self.fake.session(self._sid())
+        if path == "/":
+            if sess is not None:
+                return self._redirect("/reseller/dashboard")
+            before, after = self.fake.login_page
+            return self._send(200, before + secrets.token_urlsafe(32) + after)
+        if sess is None:
+            return self._redirect("/")
+        if path == "/reseller/dashboard":
+            return self._send(200, self.fake.dashboard)
+        if path == "/reseller/m3u/new":
+            before, after = self.fake.form_page
+            return self._send(200, before + sess["token"] + after)
+        self._send(404, "<h1>Not found</h1>")
+
+    def do_POST(self) -> None:
+        form = self._form()             # always drain the body, keep-alive depends on it
+        if self._delay_and_maybe_fail():
+            return
+        path = urlsplit(self.path).path
+        fake = self.fake
+
+        if path == "/":
+            sid = secrets.token_hex(16)
+            with fake.lock:
+                fake.stats["logins"] += 1
+                fake.sessions[sid] = {"user": form.get("_username", [""])[0],
+                                      "token": secrets.token_urlsafe(32),
+                                      "at": time.monotonic()}
+            return self._redirect("/reseller/dashboard", {"Set-Cookie": f"{COOKIE}={sid}; Path=/"})
+
+        sess = fake.session(self._sid())
+        if sess is None:
+            return self._redirect("/")
+        if path != "/reseller/m3u/new":
+            return self._send(404, "<h1>Not found</h1>")
+
+        if form.get("m3u[_token]", [""])[0] != sess["token"]:
+            return self._send(200, fake.csrf_error)
+        username = form.get("m3u[username]", [""])[0]
+        with fake.lock:
+            taken = username in fake.usernames or (
+                fake.config.error_rate and random.random() < fake.config.error_rate)
+            fake.stats["rejected" if taken else "creates"] += 1
+            if not taken:
+                fake.usernames.add(username)
+        self._send(200, fake.taken if taken else fake.success)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local GoldenOTT stand-in for benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=50.0, help="mean latency per request, ms")
+    parser.add_argument("--jitter", type=float, default=20.0, help="uniform +/- jitter, ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of creates rejected")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered 503")
+    parser.add_argument("--session-ttl", type=float, default=0.0, help="login lifetime, s (0 = forever)")
+    opts = parser.parse_args()
+
+    fake = FakeGoldenOTT(
+        FakeConfig(opts.latency, opts.jitter, opts.error_rate, opts.fail_rate, opts.session_ttl),
+        host=opts.host,
+        port=opts.port,
+    )
+    print(f"fake GoldenOTT on {fake.base_url} – Ctrl+C to stop.")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fake.server.server_close()
+        print("stats:", fake.stats)
+
+
+if __name__ == "__main__":
+    main()
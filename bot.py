@@ -10,11 +10,10 @@ from __future__ import annotations
 import asyncio
 import html
 import os
+from datetime import datetime
 from pathlib import Path
 
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
-import requests
 from telegram import (
     Update,
     InlineKeyboardButton,
@@ -33,6 +32,20 @@ from telegram.ext import (
     filters,
 )
 
+from goldenott import metrics
+from goldenott.accounts import parse_accounts
+from goldenott.aio import AsyncAccounts, AsyncGoldenOTT
+from goldenott.breaker import CircuitBreaker
+from goldenott.client import PAYLOAD
+from goldenott.errors import UpstreamUnavailable
+from goldenott.hosts import HostProber
+from goldenott.ledger import Ledger
+from goldenott.limiter import SharedLimiter
+from goldenott.names import UsernameIndex
+from goldenott.persistence import SQLitePersistence
+from goldenott.scan import username_taken
+from goldenott.updates import PerChatUpdateProcessor
+
 # ----------------------------------------------------------------------
 # 0.  environment -------------------------------------------------------
 # ----------------------------------------------------------------------
@@ -42,138 +55,75 @@ load_dotenv(BASE_DIR / ".env")      # reads reseller & bot creds
 BOT_TOKEN           = os.getenv("TELEGRAM_TOKEN")
 RESELLER_USERNAME   = os.getenv("GOLDENOTT_USERNAME")
 RESELLER_PASSWORD   = os.getenv("GOLDENOTT_PASSWORD")
+ACCOUNTS            = parse_accounts(os.getenv("GOLDENOTT_ACCOUNTS"), RESELLER_USERNAME, RESELLER_PASSWORD)
+ACCOUNT_COOLDOWN    = float(os.getenv("ACCOUNT_COOLDOWN", "300"))  # ejected accounts rest this long
+BASE_URL            = os.getenv("GOLDENOTT_BASE_URL", "https://goldenott.net")
+MAX_CONNECTIONS     = int(os.getenv("GOLDENOTT_MAX_CONNECTIONS", "50"))
+DEDUP_TTL           = float(os.getenv("DEDUP_TTL", "300"))       # replay finished creates this long
+USERNAME_INDEX      = os.getenv("USERNAME_INDEX", str(BASE_DIR / "usernames.txt"))
+LEDGER_DB           = os.getenv("LEDGER_DB", str(BASE_DIR / "lines.db"))
+LIMITER_DB          = os.getenv("LIMITER_DB", str(BASE_DIR / "upstream.db"))   # shared with app.py
+MAX_INFLIGHT        = float(os.getenv("UPSTREAM_MAX_INFLIGHT", "32"))
+UPSTREAM_RETRIES    = int(os.getenv("UPSTREAM_RETRIES", "2"))
+STATE_DB            = os.getenv("STATE_DB", str(BASE_DIR / "state.db"))
+CONVERSATION_TTL    = float(os.getenv("CONVERSATION_TTL", "900"))  # idle flows end after this
+MAX_USERS           = int(os.getenv("MAX_USERS", "10000"))          # cap on users kept in memory
+PORTAL_HOSTS        = [h.strip() for h in os.getenv("PORTAL_HOSTS", ",".join([
+    "http://gndk28.xyz:80",
+    "http://activefrance.net",
+    "http://atg100.xyz",
+    "http://teck-tv.com",
+    "http://tripleserver3.com:80",
+    "http://xrf98.com",
+    "http://likan.me",
+])).split(",") if h.strip()]
+PROBE_INTERVAL      = float(os.getenv("PROBE_INTERVAL", "300"))    # seconds between host probes
+CONCURRENT_UPDATES  = int(os.getenv("CONCURRENT_UPDATES", "256"))
+WEBHOOK_URL         = os.getenv("WEBHOOK_URL", "").rstrip("/")      # public https base; empty = polling
+WEBHOOK_LISTEN      = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")
+WEBHOOK_PORT        = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH        = os.getenv("WEBHOOK_PATH", "telegram").strip("/")
+WEBHOOK_SECRET      = os.getenv("WEBHOOK_SECRET") or None
+METRICS_HOST        = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT        = int(os.getenv("METRICS_PORT", "9108"))   # 0 disables /metrics
 
 if not BOT_TOKEN:
     raise RuntimeError("TELEGRAM_TOKEN missing from .env")
-if not (RESELLER_USERNAME and RESELLER_PASSWORD):
-    raise RuntimeError("GOLDENOTT_USERNAME / GOLDENOTT_PASSWORD missing in .env")
-
+if not ACCOUNTS:
+    raise RuntimeError("GOLDENOTT_ACCOUNTS or GOLDENOTT_USERNAME / GOLDENOTT_PASSWORD missing in .env")
+if not PORTAL_HOSTS:
+    raise RuntimeError("PORTAL_HOSTS is set but lists no hosts")
 
-# ----------------------------------------------------------------------
-# 1.  bouquet constants (full lists) -----------------------------------
-# ----------------------------------------------------------------------
-BOUQUET_LIVE = [
-    "1393", "1357", "1374", "1356", "1353", "1355", "1369", "1354", "1373", "580",
-    "1364", "1394", "119", "115", "1331", "118", "1454", "120", "117", "116", "217",
-    "561", "650", "1313", "272", "560", "1316", "1317", "1314", "1322", "1385",
-    "1321", "1315", "1319", "1323", "574", "12", "16", "563", "15", "1375", "19",
-    "26", "1398", "73", "509", "508", "511", "516", "510", "512", "562", "525",
-    "513", "514", "270", "517", "518", "520", "1384", "522", "524", "523", "526",
-    "1372", "528", "1265", "1267", "1266", "273", "1269", "1268", "1270", "558",
-    "47", "51", "74", "254", "192", "48", "56", "1469", "1335", "1474", "566",
-    "1336", "1475", "565", "1470", "1337", "1476", "559", "1338", "1477", "1472",
-    "1473", "1471", "809", "1478", "53", "45", "107", "124", "810", "811", "812",
-    "813", "1376", "814", "815", "816", "817", "61", "1303", "1304", "1305", "1306",
-    "1307", "1308", "1351", "1348", "250", "77", "136", "1289", "1332", "164", "25",
-    "78", "79", "267", "1379", "1380", "1378", "1383", "20", "32", "27", "82", "81",
-    "44", "262", "83", "1382", "42", "21", "22", "23", "28", "35", "24", "76", "31",
-    "29", "30", "40", "86", "38", "33", "37", "39", "41", "36", "34", "43", "1287",
-    "1278", "1284", "1279", "1280", "1281", "1283", "1285", "1282", "1392", "1286",
-    "556", "139", "137", "228", "227", "138", "226", "229", "230", "231", "232",
-    "567", "140", "245", "242", "244", "234", "233", "1387", "274", "241", "141",
-    "240", "238", "237", "239", "235", "236", "1377", "269", "268", "243", "249",
-    "247", "248", "80", "218", "555", "590", "557", "187", "564", "145", "65",
-    "220", "57", "1294", "1295", "1296", "1297", "1298", "1299", "1300", "50", "58",
-    "596", "54", "104", "607", "100", "109", "89", "64", "1310", "1386", "579",
-    "588", "1349", "594"
-]
-
-BOUQUET_VOD = [
-    "1358", "1368", "1365", "1367", "1366", "1242", "103", "193", "179", "180",
-    "913", "185", "256", "259", "904", "897", "922", "902", "896", "901", "920",
-    "923", "895", "928", "921", "903", "910", "1311", "911", "898", "912", "571",
-    "111", "94", "189", "215", "263", "257", "260", "884", "877", "863", "879",
-    "864", "876", "872", "1291", "889", "880", "891", "881", "888", "883", "585",
-    "870", "885", "875", "882", "862", "1453", "101", "110", "587", "186", "106",
-    "586", "1389", "184", "1391", "1460", "1388", "191", "190", "1293", "1292",
-    "1464", "1466", "128", "1224", "1226", "188", "125", "72", "71", "99", "1423",
-    "1462", "1438", "1437", "1441", "1442", "1449", "1452", "1440", "1424", "1428",
-    "1429", "1463", "264", "1433", "1431", "1468", "1430", "1434", "1432", "1435",
-    "1450", "1436", "1448", "1443", "1444", "1446", "1447", "108", "1220", "68",
-    "112", "1129", "575", "576", "577", "578", "163", "1264", "1261", "1260",
-    "1262", "221", "223", "529", "595", "1231", "1230", "1233", "1228", "1232",
-    "1234", "166", "178", "175", "182", "167", "651", "658", "666", "222", "1344",
-    "1347", "1390", "659", "1345", "1346", "664", "1399", "174", "168", "531",
-    "584", "568", "1465", "532", "573", "252", "214", "581", "173", "169", "572",
-    "171", "1312", "172", "181", "1455", "1456", "1457", "1458", "1459", "1326",
-    "1327", "1328", "1329", "1330", "277", "278", "279", "280", "281", "266",
-    "251", "170", "161", "597", "253", "801", "799", "800", "533", "582", "794"
-]
 
 # ----------------------------------------------------------------------
-# 2.  raw HTTP helpers --------------------------------------------------
+# 1.  GoldenOTT clients (asyncio-native, one per reseller account) -----
 # ----------------------------------------------------------------------
-def login(session: requests.Session) -> None:
-    r = session.get("https://goldenott.net/")
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
-    token = soup.select_one('input[name="_csrf_token"]')
-    if not token:
-        raise RuntimeError("Login CSRF token not found")
-    payload = {
-        "_username": RESELLER_USERNAME,
-        "_password": RESELLER_PASSWORD,
-        "_csrf_token": token["value"],
-    }
-    r = session.post("https://goldenott.net/", data=payload, allow_redirects=True)
-    r.raise_for_status()
-    if "Dashboard" not in r.text and "Logout" not in r.text:
-        raise RuntimeError("Login failed")
-
-
-def fetch_create_token(session: requests.Session) -> str:
-    r = session.get("https://goldenott.net/reseller/m3u/new")
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "html.parser")
-    token = soup.select_one('input[name="m3u[_token]"]')
-    if not token:
-        raise RuntimeError("Create-form CSRF token not found")
-    return token["value"]
-
-
-def build_payload(form_csrf: str,
-                  user: str,
-                  passwd: str,
-                  adult_flag: str,
-                  forced_country: str) -> list[tuple[str, str]]:
-    pairs = [
-        ("m3u[username]",      user),
-        ("m3u[id]",            ""),
-        ("m3u[password]",      passwd),
-        ("m3u[period]",        "1"),
-        ("m3u[fullName]",      ""),
-        ("m3u[email]",         ""),
-        ("m3u[phone]",         ""),
-        ("m3u[note]",          ""),
-        ("m3u[forcedCountry]", forced_country),   # \"\" for Auto, \"ALL\" for VPN
-        ("m3u[adult]",         adult_flag),
-        ("m3u[_token]",        form_csrf),
-    ]
-    pairs.extend(("m3u[bouquetLive][]", b) for b in BOUQUET_LIVE)
-    pairs.extend(("m3u[bouquetVod][]",  v) for v in BOUQUET_VOD)
-    return pairs
-
-
-def goldenott_create(username: str,
-                     password: str,
-                     adult_flag: str,
-                     forced_country: str) -> str:
-    with requests.Session() as sess:
-        login(sess)
-        form_token = fetch_create_token(sess)
-        data = build_payload(form_token, username, password, adult_flag, forced_country)
-        r = sess.post(
-            "https://goldenott.net/reseller/m3u/new",
-            data=data,
-            headers={"Referer": "https://goldenott.net/reseller/m3u/new"},
-            allow_redirects=True,
-            timeout=30,
+LEDGER = Ledger(LEDGER_DB)
+BREAKER = CircuitBreaker(f"{BASE_URL.rstrip('/')}/")
+GOLDENOTT = AsyncAccounts(
+    [
+        AsyncGoldenOTT(
+            user,
+            password,
+            PAYLOAD,                           # shared with app.py (goldenott.client)
+            base_url=BASE_URL,
+            max_connections=MAX_CONNECTIONS,
+            limiter=SharedLimiter(LIMITER_DB, name=f"goldenott:{user}", max_cap=MAX_INFLIGHT),
+            retries=UPSTREAM_RETRIES,
+            breaker=BREAKER,
         )
-        r.raise_for_status()
-        return r.text
+        for user, password in ACCOUNTS
+    ],
+    dedup_ttl=DEDUP_TTL,
+    ledger=LEDGER,
+    cooldown=ACCOUNT_COOLDOWN,
+)
+TAKEN = UsernameIndex(USERNAME_INDEX)      # names created or rejected as used
+HOSTS = HostProber(PORTAL_HOSTS)
+PERSISTENCE = SQLitePersistence(STATE_DB, ttl=CONVERSATION_TTL, max_users=MAX_USERS)
 
 # ----------------------------------------------------------------------
-# 3.  Telegram conversation --------------------------------------------
+# 2.  Telegram conversation --------------------------------------------
 # ----------------------------------------------------------------------
 ASK_USERNAME, ASK_PASSWORD, ASK_COUNTRY, ASK_ADULT = range(4)
 
@@ -194,6 +144,12 @@ async def got_username(update: Update, context: ContextTypes.DEFAULT_TYPE):
             parse_mode=ParseMode.MARKDOWN_V2,
         )
         return ASK_USERNAME
+    if candidate in TAKEN:
+        await update.message.reply_text(
+            "🚫 *Username already taken* – send another one\\.",
+            parse_mode=ParseMode.MARKDOWN_V2,
+        )
+        return ASK_USERNAME
     context.user_data["username"] = candidate
     await update.message.reply_text("Now the *password*:", parse_mode=ParseMode.MARKDOWN_V2)
     return ASK_PASSWORD
@@ -241,41 +197,46 @@ async def got_adult_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
         pass
 
     adult_flag = "1" if q.data == "adult_yes" else "0"
-    u  = context.user_data["username"]
-    p  = context.user_data["password"]
-    fc = context.user_data["forced_country"]
+    u  = context.user_data.get("username")
+    p  = context.user_data.get("password")
+    fc = context.user_data.get("forced_country")
+    context.user_data.clear()           # flow is over – don't keep the password around
 
     try:
         await q.edit_message_reply_markup(None)
     except BadRequest:
         pass
 
+    if u is None or p is None or fc is None:
+        # answers dropped by the idle-state sweep (or lost across a restart)
+        await q.message.reply_text("⌛ Session expired – send /start again.")
+        return ConversationHandler.END
+
     await q.message.reply_text("⏳ Working…")
 
     try:
-        html_response = await asyncio.to_thread(goldenott_create, u, p, adult_flag, fc)
-        soup = BeautifulSoup(html_response, "html.parser")
-        err_div = soup.select_one("div.alert-danger")
-        if err_div:
-            msg_head = f"❌ Error: {err_div.get_text(' ', strip=True)}"
-        else:
+        outcome = await GOLDENOTT.create(u, p, adult_flag, fc)
+        if outcome.ok or username_taken(outcome.message):
+            TAKEN.add(u)
+        if outcome.ok:
             msg_head = "✅ User created successfully!"
+        else:
+            msg_head = f"❌ Error: {outcome.message}"
+    except UpstreamUnavailable as exc:
+        await q.message.reply_text(f"⚠️ {exc}")
+        return ConversationHandler.END
     except Exception as exc:
         msg_head = f"❌ Error: {exc}"
 
+    hosts = HOSTS.ranked()              # fastest reachable portal first
+    urls = "".join(f"{host}\n" for host in hosts)
     info_msg = (
         f"Username : {u}\n"
         f"Password : {p}\n"
         f"actived : 1 day trial\n"
         f"\nThe URL :\n\n"
-        f"http://gndk28.xyz:80\n"
-        f"http://activefrance.net\n"
-        f"http://atg100.xyz\n"
-        f"http://teck-tv.com\n"
-        f"http://tripleserver3.com:80\n"
-        f"http://xrf98.com\n"
-        f"http://likan.me\n"
-        f"\nM3U Link : http://gndk28.xyz/get.php?username={u}&password={p}&type=m3u_plus&output=mpegts\n"
+        f"{urls}"
+        f"\nM3U Link : {hosts[0]}/get.php?username={u}&password={p}&type=m3u_plus&output=mpegts\n"
         f"\nApk link : https://up.goldenott.net\n"
         f"\nSAMSUNG/LG IPTV SMARTERS DNS : http://line.4smart.in\n"
         f"\nMag portal : http://gndk28.xyz/c\n"
@@ -285,16 +246,76 @@ async def got_adult_button(update: Update, context: ContextTypes.DEFAULT_TYPE):
     return ConversationHandler.END
 
 
+async def line_lookup(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """/line <username> – the last few ledger entries for that name."""
+    if not context.args:
+        await update.message.reply_text("Usage: /line <username>")
+        return
+    username = context.args[0].strip()
+    rows = await asyncio.to_thread(LEDGER.find, username)
+    if not rows:
+        await update.message.reply_text(f"No line recorded for {username}.")
+        return
+    entries = []
+    for row in rows:
+        when = datetime.fromtimestamp(row["created_at"]).strftime("%Y-%m-%d %H:%M")
+        mark = "✅" if row["outcome"] == "success" else "❌"
+        entries.append(
+            f"{mark} {when} ({row['source']})\n"
+            f"Adult : {'yes' if row['adult'] else 'no'} · "
+            f"Country : {'VPN' if row['forced_country'] else 'Auto'}\n"
+            f"{row['message']}"
+        )
+    await update.message.reply_text(f"Username : {username}\n\n" + "\n\n".join(entries))
+
+
 async def cancel(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    context.user_data.clear()
     await update.message.reply_text("Conversation cancelled.", reply_markup=ReplyKeyboardRemove())
     return ConversationHandler.END
 
 
 # ----------------------------------------------------------------------
-# 4.  bootstrap ---------------------------------------------------------
+# 3.  bootstrap ---------------------------------------------------------
 # ----------------------------------------------------------------------
+async def warm_goldenott(app: Application) -> None:
+    try:
+        await GOLDENOTT.warm()
+    except Exception as exc:
+        print("[WARN] GoldenOTT warm-up failed:", exc)
+
+
+async def probe_hosts(context: ContextTypes.DEFAULT_TYPE) -> None:
+    latency = await HOSTS.probe()
+    down = [host for host, secs in latency.items() if secs is None]
+    if down:
+        print("[WARN] portal hosts unreachable:", ", ".join(down))
+
+
+async def sweep_state(context: ContextTypes.DEFAULT_TYPE) -> None:
+    dropped = await PERSISTENCE.sweep(context.application)
+    if dropped:
+        print(f"[INFO] dropped idle state for {dropped} user(s)")
+
+
+async def post_init(app: Application) -> None:
+    # log in and fetch a form token while the first users are still typing
+    app.create_task(warm_goldenott(app))
+
+
+async def post_shutdown(app: Application) -> None:
+    await GOLDENOTT.aclose()
+
+
 def main():
-    builder = Application.builder().token(BOT_TOKEN)
+    builder = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .concurrent_updates(PerChatUpdateProcessor(CONCURRENT_UPDATES))
+        .persistence(PERSISTENCE)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+    )
     app = builder.build()
 
     convo = ConversationHandler(
@@ -308,13 +329,35 @@ def main():
         fallbacks=[CommandHandler("cancel", cancel)],
         name="goldenott_convo",
         allow_reentry=True,
+        persistent=True,
+        conversation_timeout=CONVERSATION_TTL,
     )
 
     app.add_handler(convo)
     app.add_handler(CommandHandler("cancel", cancel))
-
-    print("Telegram bot running – Ctrl+C to stop.")
-    app.run_polling()
+    app.add_handler(CommandHandler("line", line_lookup))
+    # needs python-telegram-bot[job-queue], as does conversation_timeout
+    app.job_queue.run_repeating(sweep_state, interval=60, first=60)
+    app.job_queue.run_repeating(probe_hosts, interval=PROBE_INTERVAL, first=0)
+
+    if METRICS_PORT:
+        metrics.serve_metrics(METRICS_HOST, METRICS_PORT)
+        print(f"Metrics on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    if WEBHOOK_URL:
+        # needs python-telegram-bot[webhooks]; put a TLS proxy in front of the listener
+        print(f"Telegram bot on webhook {WEBHOOK_URL}/{WEBHOOK_PATH} "
+              f"(listening on {WEBHOOK_LISTEN}:{WEBHOOK_PORT}) – Ctrl+C to stop.")
+        app.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=f"{WEBHOOK_URL}/{WEBHOOK_PATH}",
+            secret_token=WEBHOOK_SECRET,
+            max_connections=100,
+        )
+    else:
+        print("Telegram bot running – Ctrl+C to stop.")
+        app.run_polling()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,3 @@
+"""
+Shared plumbing for the two GoldenOTT entry points (app.py and bot.py).
+"""
@@ -0,0 +1,122 @@
+"""
+Creates spread over several reseller accounts.
+
+``GOLDENOTT_ACCOUNTS`` lists ``username:password`` pairs (comma or newline
+separated); without it the single ``GOLDENOTT_USERNAME`` /
+``GOLDENOTT_PASSWORD`` pair is used, so existing setups keep working.
+
+``AccountRouter`` hands each create to the account with the fewest creates
+in flight (ties go round-robin).  An account whose login fails
+*max_login_failures* times in a row, or that reports no credits left, is
+ejected for *cooldown* seconds and then put back in rotation on its own.
+The last account in rotation is never ejected: its failures go back to the
+caller, so a glitch costs one create rather than a cooldown of outages.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Generic, Iterator, TypeVar
+
+from goldenott import metrics
+
+T = TypeVar("T")
+
+
+def parse_accounts(spec: str | None,
+                   username: str | None = None,
+                   password: str | None = None) -> list[tuple[str, str]]:
+    """``(username, password)`` pairs from *spec*, else the single pair given."""
+    accounts: list[tuple[str, str]] = []
+    for entry in (spec or "").replace("\n", ",").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        user, sep, secret = entry.partition(":")
+        if not (sep and user.strip() and secret):
+            raise ValueError(f"GOLDENOTT_ACCOUNTS entry {user.strip()!r} is not username:password")
+        accounts.append((user.strip(), secret))
+    if not accounts and username and password:
+        accounts.append((username, password))
+    return accounts
+
+
+class AccountRouter(Generic[T]):
+    """Least-in-flight routing over per-account clients keyed by reseller
+    username (a ``FormTokenCache`` in app.py, an ``AsyncGoldenOTT`` in bot.py)."""
+
+    def __init__(self, clients: dict[str, T], cooldown: float = 300, max_login_failures: int = 3):
+        if not clients:
+            raise ValueError("no reseller accounts configured")
+        self.clients = clients
+        self.cooldown = cooldown
+        self.max_login_failures = max_login_failures
+        self._inflight = dict.fromkeys(clients, 0)
+        self._login_failures = dict.fromkeys(clients, 0)     # in a row
+        self._ejected: dict[str, tuple[float, str]] = {}     # name → (until, reason)
+        self._next = 0
+        self._lock = threading.Lock()
+        for name in clients:
+            metrics.ACCOUNT_UP.set(1, name)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.clients.values())
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def _pick_locked(self) -> str:
+        now = time.monotonic()
+        for name, (until, _) in list(self._ejected.items()):
+            if until <= now:
+                del self._ejected[name]
+                metrics.ACCOUNT_UP.set(1, name)
+                print(f"[INFO] reseller account {name} back in rotation")
+        names = list(self.clients)
+        self._next = (self._next + 1) % len(names)
+        order = names[self._next:] + names[:self._next]
+        live = [name for name in order if name not in self._ejected]   # never empty: see eject()
+        return min(live, key=self._inflight.__getitem__)
+
+    @contextmanager
+    def use(self) -> Iterator[tuple[str, T]]:
+        """Check out the least busy account in rotation for one create; a
+        create that gets through without ``LoginFailed`` resets the
+        account's login-failure count."""
+        with self._lock:
+            name = self._pick_locked()
+            self._inflight[name] += 1
+        try:
+            yield name, self.clients[name]
+            self._login_failures[name] = 0
+        finally:
+            with self._lock:
+                self._inflight[name] -= 1
+
+    def login_failed(self, name: str, reason: object) -> bool:
+        """Count a failed login for *name*; ejects it after
+        ``max_login_failures`` in a row.  True if it is now out of rotation."""
+        with self._lock:
+            self._login_failures[name] += 1
+            failures = self._login_failures[name]
+        if failures < self.max_login_failures:
+            return False
+        return self.eject(name, f"{failures} failed logins in a row, last: {reason}")
+
+    def eject(self, name: str, reason: object) -> bool:
+        """Take *name* out of rotation for ``cooldown`` seconds, unless it is
+        the last account left in rotation.  True if it is now out."""
+        with self._lock:
+            if name in self._ejected:
+                return True
+            last = all(other == name or other in self._ejected for other in self.clients)
+            if not last:
+                self._ejected[name] = (time.monotonic() + self.cooldown, str(reason))
+        if last:
+            print(f"[WARN] reseller account {name} failing, kept as the last one in rotation: {reason}")
+            return False
+        metrics.ACCOUNT_UP.set(0, name)
+        print(f"[WARN] reseller account {name} out of rotation for {self.cooldown:g}s: {reason}")
+        return True
@@ -0,0 +1,316 @@
+"""
+asyncio-native GoldenOTT client (httpx) for the Telegram bot.
+
+One ``httpx.AsyncClient`` holds the reseller login cookie and a shared
+keep-alive connection pool; any number of creates can be in flight on it at
+once.  The create-form token is cached per login and refetched when it ages
+out or upstream rejects it.  ``AsyncAccounts`` routes creates over one such
+client per reseller account.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from typing import Callable
+
+import httpx
+
+from goldenott import metrics
+from goldenott.accounts import AccountRouter
+from goldenott.breaker import CircuitBreaker
+from goldenott.dedup import AsyncCoalescer, create_key
+from goldenott.errors import LoginFailed, SessionExpired
+from goldenott.ledger import Ledger
+from goldenott.limiter import RETRY_STATUSES, SharedLimiter, Slot, backoff, retry_after
+from goldenott.payload import FORM_CONTENT_TYPE, PayloadTemplate
+from goldenott.scan import (
+    LOGIN_PATHS,
+    CreateOutcome,
+    classify_create,
+    create_settled,
+    has_input,
+    input_value,
+    is_login_page,
+    logged_in,
+    out_of_credits,
+)
+from goldenott.stream import aread_until
+from goldenott.tokens import csrf_rejected
+
+
+def looks_logged_out(r: httpx.Response, text: str) -> bool:
+    """True if *r* (read as far as *text*) is the login form instead of the
+    page that was asked for."""
+    if r.history and r.url.path in LOGIN_PATHS:
+        return True
+    return is_login_page(text)
+
+
+class _CreateFlow(ABC):
+    """``create()`` for a single client and for a set of accounts alike;
+    subclasses supply the upstream ``_create``."""
+
+    _recent: AsyncCoalescer
+    ledger: Ledger | None
+
+    async def create(self,
+                     username: str,
+                     password: str,
+                     adult_flag: str,
+                     forced_country: str) -> CreateOutcome:
+        """Full flow; returns the classified outcome of the create POST.
+        Identical concurrent creates share one upstream call and a finished
+        outcome is replayed for *dedup_ttl* seconds."""
+        key = create_key(username, password, adult_flag, forced_country)
+        return await self._recent.run(
+            key, lambda: self._counted_create(username, password, adult_flag, forced_country))
+
+    async def _counted_create(self,
+                              username: str,
+                              password: str,
+                              adult_flag: str,
+                              forced_country: str) -> CreateOutcome:
+        try:
+            with metrics.create_run() as run:
+                outcome = run.done(await self._create(username, password, adult_flag, forced_country))
+        except Exception as exc:
+            if self.ledger is not None:
+                self.ledger.record("bot", username, adult_flag, forced_country, error=exc)
+            raise
+        if self.ledger is not None:
+            self.ledger.record("bot", username, adult_flag, forced_country, outcome)
+        return outcome
+
+    @abstractmethod
+    async def _create(self,
+                      username: str,
+                      password: str,
+                      adult_flag: str,
+                      forced_country: str) -> CreateOutcome:
+        """One create upstream, without dedup or the ledger."""
+
+
+class AsyncGoldenOTT(_CreateFlow):
+    def __init__(self,
+                 username: str,
+                 password: str,
+                 payload: PayloadTemplate,
+                 base_url: str = "https://goldenott.net",
+                 timeout: float = 30,
+                 max_connections: int = 50,
+                 token_max_age: float = 600,
+                 dedup_ttl: float = 300,
+                 ledger: Ledger | None = None,
+                 limiter: SharedLimiter | None = None,
+                 retries: int = 2,
+                 breaker: CircuitBreaker | None = None):
+        self.username = username
+        self.password = password
+        self.payload = payload
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.token_max_age = token_max_age
+        self._client: httpx.AsyncClient | None = None
+        self._login_lock = asyncio.Lock()
+        self._login_gen = 0           # bumped on every successful login
+        self._token: tuple[str, float, int] | None = None
+        self._recent = AsyncCoalescer(ttl=dedup_ttl)
+        self.ledger = ledger
+        self.limiter = limiter
+        self.retries = retries
+        self.breaker = breaker
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                follow_redirects=True,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # ------------------------------------------------------------------
+    # login / token
+    # ------------------------------------------------------------------
+    async def _read(self,
+                    method: str,
+                    path: str,
+                    done: Callable[[str], bool],
+                    **kwargs) -> tuple[httpx.Response, str]:
+        """Send a request through the breaker and limiter and read its body
+        only as far as *done* needs.  GETs are retried with jittered backoff
+        on 429/5xx and transport errors."""
+        attempts = 1 + (self.retries if method == "GET" else 0)
+        attempt = 0
+        while True:
+            last = attempt + 1 >= attempts
+            delay = backoff(attempt)
+            if self.breaker is not None:
+                self.breaker.check()
+            async with self.limiter.aslot() if self.limiter is not None else nullcontext(Slot()) as slot:
+                try:
+                    async with self.client.stream(method, path, **kwargs) as r:
+                        slot.observe(r.status_code)
+                        if self.breaker is not None and r.status_code >= 500:
+                            self.breaker.record(False)
+                        if last or r.status_code not in RETRY_STATUSES:
+                            r.raise_for_status()
+                            text = await aread_until(r, done)
+                            if self.breaker is not None:
+                                self.breaker.record(True)     # healthy once the body arrived
+                            return r, text
+                        delay = max(delay, retry_after(r.headers.get("Retry-After")) or 0)
+                except httpx.TransportError:
+                    if self.breaker is not None:
+                        self.breaker.record(False)
+                    if last:
+                        raise
+            metrics.UPSTREAM_RETRIES.inc()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def login(self, seen_gen: int | None = None) -> None:
+        """Log in, unless another task already did since *seen_gen*."""
+        async with self._login_lock:
+            if seen_gen is not None and seen_gen != self._login_gen:
+                return
+            with metrics.timed("login"):
+                _, text = await self._read("GET", "/", has_input("_csrf_token"))
+                token = input_value(text, "_csrf_token")
+                if token is None:
+                    raise LoginFailed("Login CSRF token not found")
+                payload = {
+                    "_username": self.username,
+                    "_password": self.password,
+                    "_csrf_token": token,
+                }
+                _, text = await self._read("POST", "/", logged_in, data=payload)
+                if not logged_in(text):
+                    raise LoginFailed("Login failed")
+            self._login_gen += 1
+            self._token = None
+
+    async def _get(self, path: str, done: Callable[[str], bool]) -> str:
+        gen = self._login_gen
+        if not gen:
+            await self.login(gen)
+            gen = self._login_gen
+        r, text = await self._read("GET", path, done)
+        if looks_logged_out(r, text):
+            await self.login(gen)
+            _, text = await self._read("GET", path, done)
+        return text
+
+    async def fetch_create_token(self) -> str:
+        text = await self._get("/reseller/m3u/new", has_input("m3u[_token]"))
+        token = input_value(text, "m3u[_token]")
+        if token is None:
+            raise RuntimeError("Create-form CSRF token not found")
+        return token
+
+    async def _form_token(self) -> tuple[str, int]:
+        cached = self._token
+        if (cached is not None and cached[2] == self._login_gen
+                and time.monotonic() - cached[1] < self.token_max_age):
+            return cached[0], cached[2]
+        token = await self.fetch_create_token()
+        self._token = (token, time.monotonic(), self._login_gen)
+        return token, self._login_gen
+
+    async def warm(self) -> None:
+        await self._form_token()
+
+    # ------------------------------------------------------------------
+    # create
+    # ------------------------------------------------------------------
+    async def _create(self,
+                      username: str,
+                      password: str,
+                      adult_flag: str,
+                      forced_country: str) -> CreateOutcome:
+        retried = False                        # one re-login or fresh token per create
+        while True:
+            with metrics.timed("token"):
+                token, gen = await self._form_token()
+            body = self.payload.encode(token, username, password, adult_flag, forced_country)
+            with metrics.timed("post"):
+                r, text = await self._read(
+                    "POST",
+                    "/reseller/m3u/new",
+                    create_settled,
+                    content=body,
+                    headers={"Referer": f"{self.base_url}/reseller/m3u/new",
+                             "Content-Type": FORM_CONTENT_TYPE},
+                )
+            if looks_logged_out(r, text):
+                if retried:
+                    raise SessionExpired("create POST bounced to the login form twice")
+                await self.login(gen)          # new login → token refetched above
+                retried = True
+                continue
+            with metrics.timed("parse"):
+                outcome = classify_create(text)
+            if not retried and not outcome.ok and csrf_rejected(outcome.message):
+                if self._token is not None and self._token[0] == token:
+                    self._token = None
+                retried = True
+                continue
+            return outcome                     # a second CSRF rejection stays a failure
+
+
+class AsyncAccounts(_CreateFlow):
+    """Creates routed over one :class:`AsyncGoldenOTT` per reseller account
+    (least in flight first).  Dedup and the ledger sit in front of the
+    routing; when an account gets ejected (repeated failed logins, no
+    credits left) the create moves on to the next one."""
+
+    def __init__(self,
+                 clients: list[AsyncGoldenOTT],
+                 dedup_ttl: float = 300,
+                 ledger: Ledger | None = None,
+                 cooldown: float = 300):
+        self.router = AccountRouter({c.username: c for c in clients}, cooldown=cooldown)
+        self._recent = AsyncCoalescer(ttl=dedup_ttl)
+        self.ledger = ledger
+
+    async def warm(self) -> None:
+        clients = list(self.router)
+        results = await asyncio.gather(*(c.warm() for c in clients), return_exceptions=True)
+        for client, result in zip(clients, results):
+            if isinstance(result, LoginFailed):
+                self.router.login_failed(client.username, result)
+            elif isinstance(result, Exception):
+                raise result
+
+    async def aclose(self) -> None:
+        await asyncio.gather(*(c.aclose() for c in self.router))
+
+    async def _create(self,
+                      username: str,
+                      password: str,
+                      adult_flag: str,
+                      forced_country: str) -> CreateOutcome:
+        while True:
+            try:
+                with self.router.use() as (name, client):
+                    outcome = await client._create(username, password, adult_flag, forced_country)
+            except LoginFailed as exc:
+                if self.router.login_failed(name, exc):
+                    continue
+                raise
+            if (not outcome.ok and out_of_credits(outcome.message)
+                    and self.router.eject(name, outcome.message)):
+                continue
+            return outcome
@@ -0,0 +1,100 @@
+"""
+Batch account creation: parse CSV/JSON rows and run them through a bounded
+worker pool, yielding one result per row as soon as it finishes.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+TRUTHY = {"1", "true", "yes", "y", "on"}
+VPN_CHOICES = {"vpn", "all"}
+
+
+@dataclass
+class BatchRow:
+    index: int
+    username: str
+    password: str
+    adult_flag: str         # "1" / "0"
+    forced_country: str     # "" for Auto, "ALL" for VPN
+
+
+def _row(index: int, raw: dict[str, Any]) -> BatchRow:
+    fields = {str(k).strip().lower(): v for k, v in raw.items() if k is not None}
+    adult = str(fields.get("adult", "") or "").strip().lower()
+    country = str(fields.get("forced_country", "") or "").strip().lower()
+    return BatchRow(
+        index=index,
+        username=str(fields.get("username", "") or "").strip(),
+        password=str(fields.get("password", "") or "").strip(),
+        adult_flag="1" if adult in TRUTHY else "0",
+        forced_country="ALL" if country in VPN_CHOICES else "",
+    )
+
+
+def decode_rows(data: bytes) -> str:
+    """Text of an uploaded batch file; ``ValueError`` unless it is UTF-8."""
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise ValueError(f"batch file is not UTF-8 text (byte {exc.start}) – "
+                         "save it as \"CSV UTF-8\"") from None
+
+
+def parse_rows(text: str, fmt: str) -> list[BatchRow]:
+    """*fmt* is ``"json"`` (a list of objects, or ``{"rows": [...]}``) or
+    ``"csv"`` (header row with username,password[,adult][,forced_country]);
+    ``ValueError`` if *text* doesn't parse."""
+    if fmt == "json":
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = data.get("rows", [])
+        if not isinstance(data, list) or not all(isinstance(r, dict) for r in data):
+            raise ValueError("JSON batch must be a list of row objects")
+        records: Iterable[dict[str, Any]] = data
+    elif fmt == "csv":
+        records = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+    else:
+        raise ValueError(f"unsupported batch format {fmt!r}")
+    try:
+        return [_row(i, raw) for i, raw in enumerate(records)]
+    except csv.Error as exc:
+        raise ValueError(f"bad CSV: {exc}") from None
+
+
+def run_batch(rows: list[BatchRow],
+              create: Callable[[BatchRow], dict[str, Any]],
+              workers: int = 4) -> Iterator[dict[str, Any]]:
+    """Run *create* for every row on at most *workers* threads and yield
+    ``{"row": .., "username": .., **create(row)}`` in completion order.
+
+    Closing the iterator early cancels rows that have not started yet.
+    """
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="goldenott-batch")
+    pending: dict[Future, BatchRow] = {}
+    try:
+        for row in rows:
+            pending[pool.submit(create, row)] = row
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                row = pending.pop(fut)
+                result = {"row": row.index, "username": row.username}
+                try:
+                    result.update(fut.result())
+                except Exception as exc:
+                    result.update(ok=False, message=str(exc))
+                yield result
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def to_json_line(result: dict[str, Any]) -> str:
+    return json.dumps(result, ensure_ascii=False) + "\n"
+
@@ -0,0 +1,90 @@
+"""
+Circuit breaker for the GoldenOTT backend.
+
+After *failure_threshold* consecutive failed requests (transport errors,
+timeouts, 5xx) the circuit opens: ``check()`` raises
+:class:`UpstreamUnavailable` straight away instead of letting callers sit on
+sockets.  While open, a daemon thread probes *probe_url* every
+*probe_interval* seconds and closes the circuit once a probe gets a non-5xx
+answer (any success seen by a request still in flight closes it too).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from goldenott import metrics
+from goldenott.errors import UpstreamUnavailable
+
+
+class CircuitBreaker:
+    def __init__(self,
+                 probe_url: str,
+                 failure_threshold: int = 5,
+                 probe_interval: float = 5.0,
+                 probe_timeout: float = 5.0):
+        self.probe_url = probe_url
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._lock = threading.Lock()
+        metrics.UPSTREAM_UP.set(1)
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def check(self) -> None:
+        opened_at = self._opened_at
+        if opened_at is not None:
+            down_for = time.monotonic() - opened_at
+            raise UpstreamUnavailable(
+                f"GoldenOTT is unavailable (no healthy answer for {down_for:.0f}s) – try again shortly")
+
+    def record(self, healthy: bool) -> None:
+        if healthy:
+            self.record_success()
+        else:
+            self.record_failure()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            if self._opened_at is not None:
+                self._close_locked()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is None and self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                metrics.UPSTREAM_UP.set(0)
+                print(f"[WARN] GoldenOTT failing ({self._failures} in a row) – circuit open")
+                threading.Thread(target=self._probe, name="goldenott-probe", daemon=True).start()
+
+    def _close_locked(self) -> None:
+        down_for = time.monotonic() - self._opened_at
+        self._opened_at = None
+        self._failures = 0
+        metrics.UPSTREAM_UP.set(1)
+        print(f"[INFO] GoldenOTT reachable again after {down_for:.0f}s – circuit closed")
+
+    def _probe(self) -> None:
+        import urllib.error
+        import urllib.request                  # only needed once the circuit has opened
+
+        while self.is_open:
+            time.sleep(self.probe_interval)
+            try:
+                with urllib.request.urlopen(self.probe_url, timeout=self.probe_timeout):
+                    healthy = True
+            except urllib.error.HTTPError as exc:
+                healthy = exc.code < 500
+            except OSError:
+                healthy = False
+            if healthy:
+                with self._lock:
+                    if self._opened_at is not None:
+                        self._close_locked()
@@ -0,0 +1,281 @@
+"""
+The GoldenOTT create flow shared by app.py, batch.py and bot.py.
+
+The bouquet lists and the pre-encoded ``PAYLOAD`` live here once.
+``GoldenOTT`` is the sync client app.py and batch.py create through: one
+pool of logged-in ``requests`` sessions per reseller account, routed by
+:class:`~goldenott.accounts.AccountRouter`, with dedup and the ledger in
+front (the twin of ``goldenott.aio.AsyncAccounts`` in bot.py).
+
+requests and the session pool are imported only when a ``GoldenOTT`` is
+built, so bot.py can take ``PAYLOAD`` from here without paying for them.
+"""
+
+from __future__ import annotations
+
+from functools import partial
+from typing import TYPE_CHECKING
+
+from goldenott import metrics
+from goldenott.accounts import AccountRouter
+from goldenott.dedup import Coalescer, create_key
+from goldenott.errors import LoginFailed, SessionExpired
+from goldenott.payload import FORM_CONTENT_TYPE, PayloadTemplate
+from goldenott.scan import (
+    CreateOutcome,
+    classify_create,
+    create_settled,
+    has_input,
+    input_value,
+    logged_in,
+    out_of_credits,
+)
+from goldenott.tokens import FormTokenCache, csrf_rejected
+
+if TYPE_CHECKING:
+    from goldenott.breaker import CircuitBreaker
+    from goldenott.ledger import Ledger
+    from goldenott.pool import PooledSession
+
+CREATE_PATH = "/reseller/m3u/new"
+
+# ----------------------------------------------------------------------
+# bouquets --------------------------------------------------------------
+# ----------------------------------------------------------------------
+BOUQUET_LIVE = [
+    "1393", "1357", "1374", "1356", "1353", "1355", "1369", "1354", "1373", "580",
+    "1364", "1394", "119", "115", "1331", "118", "1454", "120", "117", "116", "217",
+    "561", "650", "1313", "272", "560", "1316", "1317", "1314", "1322", "1385",
+    "1321", "1315", "1319", "1323", "574", "12", "16", "563", "15", "1375", "19",
+    "26", "1398", "73", "509", "508", "511", "516", "510", "512", "562", "525",
+    "513", "514", "270", "517", "518", "520", "1384", "522", "524", "523", "526",
+    "1372", "528", "1265", "1267", "1266", "273", "1269", "1268", "1270", "558",
+    "47", "51", "74", "254", "192", "48", "56", "1469", "1335", "1474", "566",
+    "1336", "1475", "565", "1470", "1337", "1476", "559", "1338", "1477", "1472",
+    "1473", "1471", "809", "1478", "53", "45", "107", "124", "810", "811", "812",
+    "813", "1376", "814", "815", "816", "817", "61", "1303", "1304", "1305", "1306",
+    "1307", "1308", "1351", "1348", "250", "77", "136", "1289", "1332", "164", "25",
+    "78", "79", "267", "1379", "1380", "1378", "1383", "20", "32", "27", "82", "81",
+    "44", "262", "83", "1382", "42", "21", "22", "23", "28", "35", "24", "76", "31",
+    "29", "30", "40", "86", "38", "33", "37", "39", "41", "36", "34", "43", "1287",
+    "1278", "1284", "1279", "1280", "1281", "1283", "1285", "1282", "1392", "1286",
+    "556", "139", "137", "228", "227", "138", "226", "229", "230", "231", "232",
+    "567", "140", "245", "242", "244", "234", "233", "1387", "274", "241", "141",
+    "240", "238", "237", "239", "235", "236", "1377", "269", "268", "243", "249",
+    "247", "248", "80", "218", "555", "590", "557", "187", "564", "145", "65",
+    "220", "57", "1294", "1295", "1296", "1297", "1298", "1299", "1300", "50", "58",
+    "596", "54", "104", "607", "100", "109", "89", "64", "1310", "1386", "579",
+    "588", "1349", "594"
+]
+
+BOUQUET_VOD = [
+    "1358", "1368", "1365", "1367", "1366", "1242", "103", "193", "179", "180",
+    "913", "185", "256", "259", "904", "897", "922", "902", "896", "901", "920",
+    "923", "895", "928", "921", "903", "910", "1311", "911", "898", "912", "571",
+    "111", "94", "189", "215", "263", "257", "260", "884", "877", "863", "879",
+    "864", "876", "872", "1291", "889", "880", "891", "881", "888", "883", "585",
+    "870", "885", "875", "882", "862", "1453", "101", "110", "587", "186", "106",
+    "586", "1389", "184", "1391", "1460", "1388", "191", "190", "1293", "1292",
+    "1464", "1466", "128", "1224", "1226", "188", "125", "72", "71", "99", "1423",
+    "1462", "1438", "1437", "1441", "1442", "1449", "1452", "1440", "1424", "1428",
+    "1429", "1463", "264", "1433", "1431", "1468", "1430", "1434", "1432", "1435",
+    "1450", "1436", "1448", "1443", "1444", "1446", "1447", "108", "1220", "68",
+    "112", "1129", "575", "576", "577", "578", "163", "1264", "1261", "1260",
+    "1262", "221", "223", "529", "595", "1231", "1230", "1233", "1228", "1232",
+    "1234", "166", "178", "175", "182", "167", "651", "658", "666", "222", "1344",
+    "1347", "1390", "659", "1345", "1346", "664", "1399", "174", "168", "531",
+    "584", "568", "1465", "532", "573", "252", "214", "581", "173", "169", "572",
+    "171", "1312", "172", "181", "1455", "1456", "1457", "1458", "1459", "1326",
+    "1327", "1328", "1329", "1330", "277", "278", "279", "280", "281", "266",
+    "251", "170", "161", "597", "253", "801", "799", "800", "533", "582", "794"
+]
+
+PAYLOAD = PayloadTemplate(BOUQUET_LIVE, BOUQUET_VOD)
+
+
+# ----------------------------------------------------------------------
+# login / form token ----------------------------------------------------
+# ----------------------------------------------------------------------
+def login(session: PooledSession, username: str, password: str, base_url: str) -> None:
+    with metrics.timed("login"):
+        r = session.get(f"{base_url}/", stream=True)
+        r.raise_for_status()
+        token = input_value(session.read_until(r, has_input("_csrf_token")), "_csrf_token")
+        if token is None:
+            raise LoginFailed("Login CSRF token not found")
+        payload = {
+            "_username": username,
+            "_password": password,
+            "_csrf_token": token,
+        }
+        r = session.post(f"{base_url}/", data=payload, allow_redirects=True, stream=True)
+        r.raise_for_status()
+        if not logged_in(session.read_until(r, logged_in)):
+            raise LoginFailed("Login failed – still on login page")
+
+
+def fetch_create_token(session: PooledSession, create_url: str) -> str:
+    done = has_input("m3u[_token]")
+    r = session.get(create_url, stream=True)
+    r.raise_for_status()
+    text = session.read_until(r, done)
+    if session.relogin_if_logged_out(text):
+        r = session.get(create_url, stream=True)
+        r.raise_for_status()
+        text = session.read_until(r, done)
+    token = input_value(text, "m3u[_token]")
+    if token is None:
+        raise RuntimeError("Create-form CSRF token not found")
+    return token
+
+
+# ----------------------------------------------------------------------
+# client ----------------------------------------------------------------
+# ----------------------------------------------------------------------
+class GoldenOTT:
+    """Sync creates over *accounts* (``(username, password)`` pairs); each
+    account gets *pool_size* sessions and, with *limiter_db*, its own
+    adaptive in-flight cap."""
+
+    def __init__(self,
+                 accounts: list[tuple[str, str]],
+                 base_url: str = "https://goldenott.net",
+                 payload: PayloadTemplate = PAYLOAD,
+                 pool_size: int = 4,
+                 limiter_db: str | None = None,
+                 max_inflight: float = 32,
+                 retries: int = 2,
+                 breaker: CircuitBreaker | None = None,
+                 dedup_ttl: float = 300,
+                 ledger: Ledger | None = None,
+                 source: str = "app",
+                 cooldown: float = 300):
+        from goldenott.limiter import SharedLimiter
+        from goldenott.pool import SessionPool
+
+        self.base_url = base_url.rstrip("/")
+        self.create_url = f"{self.base_url}{CREATE_PATH}"
+        self.payload = payload
+        self.ledger = ledger
+        self.source = source
+        self.recent = Coalescer(ttl=dedup_ttl)
+
+        fetch = partial(fetch_create_token, create_url=self.create_url)
+        tokens = {}
+        for user, password in accounts:
+            limiter = None
+            if limiter_db is not None:
+                limiter = SharedLimiter(limiter_db, name=f"goldenott:{user}", max_cap=max_inflight)
+            pool = SessionPool(partial(login, username=user, password=password,
+                                       base_url=self.base_url),
+                               size=pool_size, limiter=limiter, retries=retries, breaker=breaker)
+            tokens[user] = FormTokenCache(pool, fetch)
+        self.router = AccountRouter(tokens, cooldown=cooldown)
+
+    def __contains__(self, key: tuple) -> bool:
+        """True while the create with this ``create_key`` is in flight or replayable."""
+        return key in self.recent
+
+    def warm(self) -> None:
+        """Log every account's sessions in and pre-fetch tokens, in the background."""
+        for tokens in self.router:
+            tokens.warm()
+
+    def create(self,
+               username: str,
+               password: str,
+               adult_flag: str,
+               forced_country: str | None) -> CreateOutcome:
+        """Full flow; returns the classified outcome.  Identical requests
+        share one upstream call and a finished outcome is replayed for
+        *dedup_ttl* seconds."""
+        key = create_key(username, password, adult_flag, forced_country)
+        return self.recent.run(
+            key, lambda: self._counted_create(username, password, adult_flag, forced_country))
+
+    def _counted_create(self,
+                        username: str,
+                        password: str,
+                        adult_flag: str,
+                        forced_country: str | None) -> CreateOutcome:
+        try:
+            with metrics.create_run() as run:
+                outcome = run.done(self._routed_create(username, password, adult_flag, forced_country))
+        except Exception as exc:
+            if self.ledger is not None:
+                self.ledger.record(self.source, username, adult_flag, forced_country, error=exc)
+            raise
+        if self.ledger is not None:
+            self.ledger.record(self.source, username, adult_flag, forced_country, outcome)
+        return outcome
+
+    def _routed_create(self,
+                       username: str,
+                       password: str,
+                       adult_flag: str,
+                       forced_country: str | None) -> CreateOutcome:
+        """Create on the least busy reseller account; when an account gets
+        ejected (repeated failed logins, no credits left) the next one takes
+        over, otherwise the failure goes back to the caller."""
+        while True:
+            try:
+                with self.router.use() as (account, tokens):
+                    outcome = self._account_create(tokens, username, password,
+                                                   adult_flag, forced_country)
+                    tokens.refill()
+            except LoginFailed as exc:
+                if self.router.login_failed(account, exc):
+                    continue
+                raise
+            if (not outcome.ok and out_of_credits(outcome.message)
+                    and self.router.eject(account, outcome.message)):
+                continue
+            return outcome
+
+    def _account_create(self,
+                        tokens: FormTokenCache,
+                        username: str,
+                        password: str,
+                        adult_flag: str,
+                        forced_country: str | None) -> CreateOutcome:
+        with tokens.pool.session(prefer=tokens.is_fresh) as sess:
+            try:
+                outcome = self._post_create(tokens, sess, username, password,
+                                            adult_flag, forced_country)
+            except SessionExpired:
+                # login lapsed between the token GET and the POST – the pool has
+                # already logged back in, so one more go with a fresh token
+                outcome = self._post_create(tokens, sess, username, password,
+                                            adult_flag, forced_country)
+            if not outcome.ok and csrf_rejected(outcome.message):
+                # cached token went stale upstream – retry once with a fresh one
+                outcome = self._post_create(tokens, sess, username, password,
+                                            adult_flag, forced_country)
+        return outcome
+
+    def _post_create(self,
+                     tokens: FormTokenCache,
+                     sess: PooledSession,
+                     username: str,
+                     password: str,
+                     adult_flag: str,
+                     forced_country: str | None) -> CreateOutcome:
+        with metrics.timed("token"):
+            form_token = tokens.take(sess)
+        body = self.payload.encode(form_token, username, password, adult_flag, forced_country)
+        with metrics.timed("post"):
+            r = sess.post(
+                self.create_url,
+                data=body,
+                headers={"Referer": self.create_url,
+                         "Content-Type": FORM_CONTENT_TYPE},
+                allow_redirects=True,
+                stream=True,
+            )
+            r.raise_for_status()
+            # stop reading as soon as the alert / success flash / form end shows up
+            html_response = sess.read_until(r, create_settled)
+            if sess.relogin_if_logged_out(html_response):
+                raise SessionExpired("create POST answered with the login form")
+        with metrics.timed("parse"):
+            return classify_create(html_response)
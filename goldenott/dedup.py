@@ -0,0 +1,142 @@
+"""
+Coalesce duplicate creates.
+
+Requests are keyed by ``(username, password, adult_flag, forced_country)``:
+while one is in flight, identical ones wait for its result instead of
+starting another upstream chain.  A settled answer – the line was created,
+or the username is taken – is replayed for *ttl* seconds; other failures
+(and exceptions) are shared with the waiters but never cached, so a retry
+goes upstream again.
+
+``Coalescer`` is for threads (app.py), ``AsyncCoalescer`` for one event
+loop (the bot's client).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Hashable
+
+from goldenott import metrics
+from goldenott.scan import CreateOutcome, username_taken
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+def create_key(username: str,
+               password: str,
+               adult_flag: str,
+               forced_country: str | None) -> tuple[str, str, str, str]:
+    return username, password, adult_flag, forced_country or ""
+
+
+def _replayable(outcome: CreateOutcome) -> bool:
+    """Retrying would get the same answer: created, or the name is taken."""
+    return outcome.ok or username_taken(outcome.message)
+
+
+class _ResultCache:
+    """TTL'd results, oldest first, capped at *max_entries*."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        item = self._items.get(key)
+        if item is None:
+            return False, None
+        if time.monotonic() - item[0] >= self.ttl:
+            del self._items[key]
+            return False, None
+        return True, item[1]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key)[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        self._items.pop(key, None)
+        self._items[key] = (time.monotonic(), value)
+        cutoff = time.monotonic() - self.ttl
+        while self._items:
+            oldest_at = next(iter(self._items.values()))[0]
+            if oldest_at >= cutoff and len(self._items) <= self.max_entries:
+                break
+            self._items.popitem(last=False)
+
+
+class Coalescer:
+    def __init__(self, ttl: float = 300, max_entries: int = 4096):
+        self._cache = _ResultCache(ttl, max_entries)
+        self._inflight: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        """A result for *key* is in flight or still replayable."""
+        with self._lock:
+            return key in self._inflight or key in self._cache
+
+    def run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            hit, value = self._cache.get(key)
+            if hit:
+                metrics.DEDUPED.inc("replayed")
+                return value
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            metrics.DEDUPED.inc("coalesced")
+            return future.result()
+
+        try:
+            value = fn()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            del self._inflight[key]
+            if _replayable(value):
+                self._cache.put(key, value)
+        future.set_result(value)
+        return value
+
+
+class AsyncCoalescer:
+    def __init__(self, ttl: float = 300, max_entries: int = 4096):
+        self._cache = _ResultCache(ttl, max_entries)
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight or key in self._cache
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        import asyncio                         # kept out of the sync entry points' imports
+
+        hit, value = self._cache.get(key)
+        if hit:
+            metrics.DEDUPED.inc("replayed")
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda t: self._settle(key, t))
+        else:
+            metrics.DEDUPED.inc("coalesced")
+        # shielded: one caller giving up must not cancel the shared create
+        return await asyncio.shield(task)
+
+    def _settle(self, key: Hashable, task: asyncio.Task) -> None:
+        del self._inflight[key]
+        if not task.cancelled() and task.exception() is None and _replayable(task.result()):
+            self._cache.put(key, task.result())
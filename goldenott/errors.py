@@ -0,0 +1,19 @@
+"""Exceptions shared by the sync pool, the async client and the metrics."""
+
+from __future__ import annotations
+
+
+class LoginFailed(RuntimeError):
+    """The reseller login itself failed (no login form, or still on it after
+    posting the credentials)."""
+
+
+class SessionExpired(RuntimeError):
+    """A POST bounced to the login form; the session was re-authenticated but
+    the request has to be rebuilt (its CSRF token belonged to the old login)."""
+
+
+class UpstreamUnavailable(RuntimeError):
+    """GoldenOTT is down or timing out; the circuit breaker is failing
+    requests fast until a health probe gets through again."""
+
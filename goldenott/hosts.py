@@ -0,0 +1,47 @@
+"""
+Latency ranking of the portal hosts listed on the bot's info card.
+
+``HostProber.probe()`` times a GET against every host concurrently (up to the
+response headers; the body is never read) and caches the result;
+``ranked()`` returns the hosts fastest-first with unreachable ones left out.
+Until the first probe finishes, or if every host failed, the configured
+order is returned unchanged.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+
+
+class HostProber:
+    def __init__(self, hosts: list[str], timeout: float = 5.0):
+        self.hosts = [h.rstrip("/") for h in hosts]
+        self.timeout = timeout
+        self.latency: dict[str, float | None] = {}     # host → seconds, None = unreachable
+        self.probed_at: float | None = None
+
+    async def _time(self, client: httpx.AsyncClient, host: str) -> float | None:
+        start = time.perf_counter()
+        try:
+            async with client.stream("GET", f"{host}/") as r:
+                if r.status_code >= 500:
+                    return None
+        except httpx.HTTPError:
+            return None
+        return time.perf_counter() - start
+
+    async def probe(self) -> dict[str, float | None]:
+        async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=False) as client:
+            results = await asyncio.gather(*(self._time(client, h) for h in self.hosts))
+        self.latency = dict(zip(self.hosts, results))
+        self.probed_at = time.time()
+        return self.latency
+
+    def ranked(self) -> list[str]:
+        up = [h for h in self.hosts if self.latency.get(h) is not None]
+        if not up:
+            return list(self.hosts)
+        return sorted(up, key=lambda h: self.latency[h])
@@ -0,0 +1,98 @@
+"""
+In-process job queue for the Flask ``/create`` route.
+
+Submissions run on a fixed worker pool and get a job id straight away;
+clients poll (or long-poll) the job, or follow it as Server-Sent Events.
+Finished jobs are kept for *ttl* seconds and then evicted.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    status: str = QUEUED
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    _finished: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobStore:
+    def __init__(self, workers: int = 4, ttl: float = 600):
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="goldenott-job")
+        self._jobs: dict[str, Job] = {}
+        self._expiry: deque[tuple[float, str]] = deque()    # (finished monotonic, id), oldest first
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., dict[str, Any]], *args: Any) -> Job:
+        """Queue ``fn(*args)``; its returned dict becomes ``job.result``."""
+        job = Job(secrets.token_urlsafe(12))
+        with self._lock:
+            self._evict_locked()
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            self._evict_locked()
+            return self._jobs.get(job_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop taking work; with *wait*, let queued and running jobs finish."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    # ------------------------------------------------------------------
+    def _run(self, job: Job, fn: Callable[..., dict[str, Any]], args: tuple) -> None:
+        job.status = RUNNING
+        try:
+            job.result = fn(*args)
+            job.status = DONE
+        except Exception as exc:
+            job.error = str(exc)
+            job.status = FAILED
+        job.finished_at = time.time()
+        with self._lock:
+            self._expiry.append((time.monotonic(), job.id))
+        job._finished.set()
+
+    def _evict_locked(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        while self._expiry and self._expiry[0][0] < cutoff:
+            _, job_id = self._expiry.popleft()
+            self._jobs.pop(job_id, None)
@@ -0,0 +1,155 @@
+"""
+SQLite ledger of every create outcome.
+
+``record()`` only enqueues; a daemon thread owns the write connection and
+commits queued rows in batches, so callers never wait on disk.  The database
+runs in WAL mode, so the ``/lines`` view and the bot's ``/line`` lookup can
+read while the writer appends.  Passwords are not stored.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from goldenott.metrics import failure_kind
+from goldenott.scan import CreateOutcome
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lines (
+    id             INTEGER PRIMARY KEY,
+    created_at     REAL    NOT NULL,
+    source         TEXT    NOT NULL,
+    username       TEXT    NOT NULL,
+    adult          INTEGER NOT NULL,
+    forced_country TEXT    NOT NULL,
+    outcome        TEXT    NOT NULL,
+    message        TEXT    NOT NULL,
+    timings        TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lines_created_at ON lines (created_at);
+CREATE INDEX IF NOT EXISTS lines_username ON lines (username, id);
+"""
+COLUMNS = ("id", "created_at", "source", "username", "adult",
+           "forced_country", "outcome", "message", "timings")
+_INSERT = ("INSERT INTO lines (created_at, source, username, adult, forced_country,"
+           " outcome, message, timings) VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+_STOP = object()
+
+
+class Ledger:
+    def __init__(self, path: str | Path, batch_size: int = 200, flush_interval: float = 0.5):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+
+        db = self._connect()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(SCHEMA)
+        db.close()
+
+        self._writer = threading.Thread(target=self._run, name="goldenott-ledger", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # ------------------------------------------------------------------
+    # writing
+    # ------------------------------------------------------------------
+    def record(self,
+               source: str,
+               username: str,
+               adult_flag: str,
+               forced_country: str | None,
+               outcome: CreateOutcome | None = None,
+               error: BaseException | None = None) -> None:
+        """Queue one create: its *outcome*, or the *error* it raised."""
+        if outcome is not None:
+            kind, message, timings = outcome.kind, outcome.message, outcome.timings
+        else:
+            kind, message, timings = failure_kind(error), str(error), {}
+        self._queue.put((time.time(), source, username, int(adult_flag == "1"),
+                         forced_country or "", kind, message,
+                         json.dumps({k: round(v, 6) for k, v in timings.items()})))
+
+    def close(self, timeout: float = 5) -> None:
+        """Flush what's queued and stop the writer."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout)
+
+    def _run(self) -> None:
+        db = self._connect()
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                                 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                stopping = True
+                batch = [row for row in batch if row is not _STOP]
+            if not batch:
+                continue
+            try:
+                with db:
+                    db.executemany(_INSERT, batch)
+            except sqlite3.Error as exc:
+                print("[WARN] ledger write failed, dropped", len(batch), "rows:", exc)
+        db.close()
+
+    # ------------------------------------------------------------------
+    # reading
+    # ------------------------------------------------------------------
+    def _query(self, sql: str, params: tuple) -> list[dict[str, Any]]:
+        db = self._connect()
+        try:
+            rows = db.execute(sql, params).fetchall()
+        finally:
+            db.close()
+        return [{**dict(zip(COLUMNS, row)), "timings": json.loads(row[-1])} for row in rows]
+
+    def lines(self,
+              before: int | None = None,
+              limit: int = 50,
+              username: str | None = None,
+              since: float | None = None,
+              until: float | None = None) -> list[dict[str, Any]]:
+        """Newest first; page on with ``before=<last id seen>``."""
+        where, params = [], []
+        if before is not None:
+            where.append("id < ?")
+            params.append(before)
+        if username:
+            where.append("username = ?")
+            params.append(username)
+        if since is not None:
+            where.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("created_at < ?")
+            params.append(until)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM lines"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        return self._query(sql, (*params, limit))
+
+    def find(self, username: str, limit: int = 5) -> list[dict[str, Any]]:
+        return self.lines(username=username, limit=limit)
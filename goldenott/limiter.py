@@ -0,0 +1,190 @@
+"""
+Upstream rate limiting shared by app.py and bot.py.
+
+``SharedLimiter`` caps in-flight requests to GoldenOTT across every process
+that opens the same SQLite file: each request holds a lease row while it is
+in flight.  Each *name* (one per reseller account) has its own cap.  The
+cap adapts AIMD-style: each quick, healthy response adds ``1/cap`` (about +1
+per round of requests), and a 429/5xx, a transport error or a response
+slower than *target_latency* halves it, at most once per
+*decrease_interval*.  Leases left behind by a crashed process expire after
+*lease_ttl*.
+
+``backoff()`` and ``retry_after()`` give the jittered delays used to retry
+idempotent GETs.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import AsyncIterator, Iterator
+
+from goldenott import metrics
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS limiter (
+    name          TEXT PRIMARY KEY,
+    cap           REAL NOT NULL,
+    last_decrease REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    id         INTEGER PRIMARY KEY,
+    name       TEXT    NOT NULL,
+    pid        INTEGER NOT NULL,
+    expires_at REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leases_name ON leases (name, expires_at);
+"""
+
+
+class UpstreamBusy(RuntimeError):
+    """No upstream slot freed up within the limiter's acquire timeout."""
+
+
+def backoff(attempt: int, base: float = 0.25, cap: float = 8.0) -> float:
+    """Full-jitter exponential delay before retry number *attempt* (0-based)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after(value: str | None, cap: float = 30.0) -> float | None:
+    """Seconds from a numeric ``Retry-After`` header, if there is one."""
+    try:
+        return min(cap, max(0.0, float(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+class Slot:
+    """One leased request; ``observe(status)`` once the response headers are in."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.latency: float | None = None
+        self.status: int | None = None
+
+    def observe(self, status: int) -> None:
+        self.latency = time.perf_counter() - self.started
+        self.status = status
+
+
+class SharedLimiter:
+    def __init__(self,
+                 path: str | Path,
+                 name: str = "goldenott",
+                 initial: float = 8,
+                 min_cap: float = 1,
+                 max_cap: float = 32,
+                 target_latency: float = 5.0,
+                 decrease_interval: float = 1.0,
+                 lease_ttl: float = 120,
+                 acquire_timeout: float = 60):
+        self.path = str(path)
+        self.name = name
+        self.min_cap = min_cap
+        self.max_cap = max_cap
+        self.target_latency = target_latency
+        self.decrease_interval = decrease_interval
+        self.lease_ttl = lease_ttl
+        self.acquire_timeout = acquire_timeout
+        self._local = threading.local()
+
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript(SCHEMA)
+        with db:
+            db.execute("INSERT OR IGNORE INTO limiter VALUES (?, ?, 0)",
+                       (name, min(max_cap, max(min_cap, initial))))
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # ------------------------------------------------------------------
+    # leases
+    # ------------------------------------------------------------------
+    def _try_acquire(self) -> int | None:
+        db = self._db()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("DELETE FROM leases WHERE name = ? AND expires_at < ?", (self.name, now))
+            (cap,) = db.execute("SELECT cap FROM limiter WHERE name = ?", (self.name,)).fetchone()
+            (inflight,) = db.execute("SELECT count(*) FROM leases WHERE name = ?",
+                                     (self.name,)).fetchone()
+            lease = None
+            if inflight < max(1, int(cap)):
+                lease = db.execute("INSERT INTO leases (name, pid, expires_at) VALUES (?, ?, ?)",
+                                   (self.name, os.getpid(), now + self.lease_ttl)).lastrowid
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        metrics.UPSTREAM_LIMIT.set(cap, self.name)
+        return lease
+
+    def _release(self, lease: int, slot: Slot) -> None:
+        latency = slot.latency if slot.latency is not None else time.perf_counter() - slot.started
+        congested = (slot.status is None or slot.status in RETRY_STATUSES
+                     or latency > self.target_latency)
+        db = self._db()
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("DELETE FROM leases WHERE id = ?", (lease,))
+            cap, last_decrease = db.execute(
+                "SELECT cap, last_decrease FROM limiter WHERE name = ?", (self.name,)).fetchone()
+            if not congested:
+                cap = min(self.max_cap, cap + 1 / cap)
+            elif now - last_decrease >= self.decrease_interval:
+                cap, last_decrease = max(self.min_cap, cap / 2), now
+            db.execute("UPDATE limiter SET cap = ?, last_decrease = ? WHERE name = ?",
+                       (cap, last_decrease, self.name))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        metrics.UPSTREAM_LIMIT.set(cap, self.name)
+
+    def _poll_delay(self, waited: float) -> float:
+        if waited >= self.acquire_timeout:
+            raise UpstreamBusy(f"no upstream slot within {self.acquire_timeout:g}s")
+        return random.uniform(0.005, 0.025)
+
+    @contextmanager
+    def slot(self) -> Iterator[Slot]:
+        start = time.monotonic()
+        lease = self._try_acquire()
+        while lease is None:
+            time.sleep(self._poll_delay(time.monotonic() - start))
+            lease = self._try_acquire()
+        slot = Slot()
+        try:
+            yield slot
+        finally:
+            self._release(lease, slot)
+
+    @asynccontextmanager
+    async def aslot(self) -> AsyncIterator[Slot]:
+        import asyncio                         # kept out of the sync entry points' imports
+
+        start = time.monotonic()
+        lease = await asyncio.to_thread(self._try_acquire)
+        while lease is None:
+            await asyncio.sleep(self._poll_delay(time.monotonic() - start))
+            lease = await asyncio.to_thread(self._try_acquire)
+        slot = Slot()
+        try:
+            yield slot
+        finally:
+            await asyncio.to_thread(self._release, lease, slot)
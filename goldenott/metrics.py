@@ -0,0 +1,269 @@
+"""
+Per-phase timings and outcome counters for GoldenOTT creates, rendered in
+the Prometheus text format (``/metrics`` in app.py, a small listener in
+bot.py).
+
+Phases are timed with ``timed("login" | "token" | "post" | "parse")``; time
+spent in a nested phase (a login that a token fetch had to redo) counts only
+toward the inner one, so sync and async clients report the same thing.  A
+create wrapped in ``create_run()`` also collects its own phase timings (via a
+context variable, so it works per thread and per asyncio task) and is
+counted as success, alert_danger, unrecognised, login_failure, timeout,
+unavailable or error.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Iterator
+
+from goldenott.errors import LoginFailed, UpstreamUnavailable
+from goldenott.scan import CreateOutcome
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{v}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.label_names = name, help_text, labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...] = ()):
+        self.name, self.help, self.label_names = name, help_text, labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self,
+                 name: str,
+                 help_text: str,
+                 labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.help, self.label_names = name, help_text, labels
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], list] = {}     # labels → [counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            if idx < len(self.buckets):
+                series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._series.items()}
+        for labels, series in sorted(snapshot.items()):
+            names = self.label_names + ("le",)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(names, labels + (f'{bound:g}',))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(names, labels + ('+Inf',))} {series[-1]}")
+            base = _labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{base} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{base} {series[-1]}")
+        return lines
+
+
+PHASE_SECONDS = Histogram(
+    "goldenott_phase_seconds",
+    "Time spent in each phase of a GoldenOTT create (login, token, post, parse).",
+    labels=("phase",),
+)
+CREATES = Counter(
+    "goldenott_creates_total",
+    "GoldenOTT creates by outcome.",
+    labels=("outcome",),
+)
+DEDUPED = Counter(
+    "goldenott_creates_deduplicated_total",
+    "Duplicate creates answered without an upstream call (coalesced in flight or replayed).",
+    labels=("kind",),
+)
+UPSTREAM_LIMIT = Gauge(
+    "goldenott_upstream_limit",
+    "Adaptive cap on in-flight upstream requests, as last seen by this process.",
+    labels=("limiter",),
+)
+UPSTREAM_UP = Gauge(
+    "goldenott_upstream_up",
+    "1 while the GoldenOTT circuit breaker is closed, 0 while it is open.",
+)
+ACCOUNT_UP = Gauge(
+    "goldenott_account_up",
+    "1 while a reseller account is in rotation, 0 while it is ejected.",
+    labels=("account",),
+)
+UPSTREAM_RETRIES = Counter(
+    "goldenott_upstream_retries_total",
+    "Idempotent upstream GETs retried after a 429/5xx or a transport error.",
+)
+OUTCOMES = ("success", "alert_danger", "unrecognised", "login_failure", "timeout",
+            "unavailable", "error")
+for _outcome in OUTCOMES:
+    CREATES.inc(_outcome, amount=0)
+for _kind in ("coalesced", "replayed"):
+    DEDUPED.inc(_kind, amount=0)
+
+UPSTREAM_RETRIES.inc(amount=0)
+
+REGISTRY: list[Counter | Gauge | Histogram] = [PHASE_SECONDS, CREATES, DEDUPED,
+                                               UPSTREAM_LIMIT, UPSTREAM_UP, ACCOUNT_UP,
+                                               UPSTREAM_RETRIES]
+
+_timings: ContextVar[dict[str, float] | None] = ContextVar("goldenott_timings", default=None)
+_nested: ContextVar[list[float] | None] = ContextVar("goldenott_nested", default=None)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    nested = [0.0]                          # seconds spent in phases timed inside this one
+    outer = _nested.get()
+    token = _nested.set(nested)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        total = time.perf_counter() - start
+        _nested.reset(token)
+        if outer is not None:
+            outer[0] += total
+        elapsed = total - nested[0]
+        PHASE_SECONDS.observe(elapsed, phase)
+        timings = _timings.get()
+        if timings is not None:
+            timings[phase] = timings.get(phase, 0.0) + elapsed
+
+
+def _timeout_errors() -> tuple[type[BaseException], ...]:
+    """Timeout exceptions of whichever HTTP clients this process has loaded
+    (an error can only come from a library that was imported)."""
+    errors: list[type[BaseException]] = [TimeoutError]
+    if "requests" in sys.modules:
+        errors.append(sys.modules["requests"].Timeout)
+        errors.append(sys.modules["urllib3"].exceptions.TimeoutError)
+    if "httpx" in sys.modules:
+        errors.append(sys.modules["httpx"].TimeoutException)
+    return tuple(errors)
+
+
+def failure_kind(exc: BaseException) -> str:
+    if isinstance(exc, LoginFailed):
+        return "login_failure"
+    if isinstance(exc, UpstreamUnavailable):
+        return "unavailable"
+    timeouts = _timeout_errors()
+    # requests re-raises a body read that timed out as ConnectionError(ReadTimeoutError)
+    if isinstance(exc, timeouts) or (exc.args and isinstance(exc.args[0], timeouts)):
+        return "timeout"
+    return "error"
+
+
+class CreateRun:
+    def __init__(self) -> None:
+        self.timings: dict[str, float] = {}
+
+    def done(self, outcome: CreateOutcome) -> CreateOutcome:
+        """Count a classified reply and attach this run's timings to it."""
+        CREATES.inc(outcome.kind)
+        outcome.timings = self.timings
+        return outcome
+
+
+@contextmanager
+def create_run() -> Iterator[CreateRun]:
+    """Scope one create: collect its phase timings into ``run.timings`` and
+    count exceptions by kind (``run.done(outcome)`` counts a classified reply)."""
+    run = CreateRun()
+    token = _timings.set(run.timings)
+    try:
+        yield run
+    except Exception as exc:
+        CREATES.inc(failure_kind(exc))
+        raise
+    finally:
+        _timings.reset(token)
+
+
+def render() -> str:
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------------------------------------------------
+# stand-alone listener (bot.py) ---------------------------------------
+# ----------------------------------------------------------------------
+def serve_metrics(host: str, port: int) -> ThreadingHTTPServer:
+    """Expose ``/metrics`` on *host*:*port* from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="goldenott-metrics", daemon=True).start()
+    return server
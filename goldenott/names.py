@@ -0,0 +1,64 @@
+"""
+Local index of usernames known to be taken upstream.
+
+Names we created, or that GoldenOTT rejected as already used, are kept in a
+set backed by an append-only text file (one name per line), so app.py and
+bot.py can turn an obvious collision away before any round trip.  Several
+processes may share the file: each append is a single ``O_APPEND`` write,
+and a lookup first reads whatever other processes have appended since.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+
+
+class UsernameIndex:
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        self._names: set[str] = set()
+        self._offset = 0            # bytes of the file already folded into _names
+        self._lock = threading.Lock()
+        with self._lock:
+            self._catch_up()
+
+    def __contains__(self, username: str) -> bool:
+        with self._lock:
+            self._catch_up()
+            return username in self._names
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._catch_up()
+            return len(self._names)
+
+    def add(self, username: str) -> None:
+        with self._lock:
+            self._catch_up()
+            if username in self._names:
+                return
+            self._names.add(username)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, f"{username}\n".encode("utf-8"))
+            finally:
+                os.close(fd)
+        # our own line is picked up (harmlessly) by the next _catch_up
+
+    def _catch_up(self) -> None:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size <= self._offset:
+            return
+        with self.path.open("rb") as fh:
+            fh.seek(self._offset)
+            chunk = fh.read(size - self._offset)
+        end = chunk.rfind(b"\n") + 1          # leave a half-written last line for later
+        for line in chunk[:end].decode("utf-8", "replace").splitlines():
+            if line.strip():
+                self._names.add(line.strip())
+        self._offset += end
@@ -0,0 +1,67 @@
+"""
+Pre-encoded body for the ``/reseller/m3u/new`` POST.
+
+Only the username, password and form token change between creates; the
+~440 bouquet fields and the adult/forced-country flags are urlencoded once
+and spliced around them.  Field order mirrors the first proven-good version
+(forcedCountry always present, _token right before the bouquets).
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+from urllib.parse import quote_plus, urlencode
+
+FORM_CONTENT_TYPE = "application/x-www-form-urlencoded"
+
+
+def _q(value: str) -> bytes:
+    return quote_plus(value, safe="").encode("ascii")
+
+
+class PayloadTemplate:
+    """Bytes template for the create form, one cached middle per variant."""
+
+    def __init__(self,
+                 bouquet_live: Iterable[str],
+                 bouquet_vod: Iterable[str],
+                 variants: Iterable[tuple[str, str]] = (("0", ""), ("0", "ALL"),
+                                                        ("1", ""), ("1", "ALL"))):
+        pairs = [("m3u[bouquetLive][]", b) for b in bouquet_live]
+        pairs += [("m3u[bouquetVod][]", v) for v in bouquet_vod]
+        self._tail = b"&" + urlencode(pairs).encode("ascii") if pairs else b""
+        self._middles: dict[tuple[str, str], bytes] = {}
+        for adult_flag, forced_country in variants:
+            self._middle(adult_flag, forced_country)
+
+    def _middle(self, adult_flag: str, forced_country: str) -> bytes:
+        key = (adult_flag, forced_country)
+        middle = self._middles.get(key)
+        if middle is None:
+            middle = (
+                b"&m3u%5Bperiod%5D=1"
+                b"&m3u%5BfullName%5D="
+                b"&m3u%5Bemail%5D="
+                b"&m3u%5Bphone%5D="
+                b"&m3u%5Bnote%5D="
+                b"&m3u%5BforcedCountry%5D=" + _q(forced_country) +   # "" for Auto, "ALL" for VPN
+                b"&m3u%5Badult%5D=" + _q(adult_flag) +
+                b"&m3u%5B_token%5D="
+            )
+            self._middles[key] = middle
+        return middle
+
+    def encode(self,
+               form_csrf: str,
+               user: str,
+               passwd: str,
+               adult_flag: str,
+               forced_country: str | None) -> bytes:
+        return b"".join((
+            b"m3u%5Busername%5D=", _q(user),
+            b"&m3u%5Bid%5D=",                       # empty == new user
+            b"&m3u%5Bpassword%5D=", _q(passwd),
+            self._middle(adult_flag, forced_country or ""),
+            _q(form_csrf),
+            self._tail,
+        ))
@@ -0,0 +1,214 @@
+"""
+SQLite persistence for the bot's conversation state.
+
+Only what the create flow needs is kept: ``user_data`` (username, password,
+forced country while a conversation is in progress) and the
+ConversationHandler states.  Each user and each conversation is one row,
+written as it changes, so nothing is ever re-pickled wholesale.
+
+Idle state is bounded two ways: ``sweep()`` (run periodically by the bot)
+drops users and conversations not touched for *ttl* seconds and the oldest
+ones beyond *max_users*, from memory and from disk; stale rows are also
+skipped when state is loaded at start-up.  A user is always dropped together
+with their conversation, so a flow never resumes without the answers it
+collected.  Live conversations are also ended by the ConversationHandler's
+``conversation_timeout``; ones restored at start-up have no timeout job, so
+the sweep is what ends those.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+from telegram.ext import Application, BasePersistence, PersistenceInput
+
+ConversationKey = tuple[int | str, ...]
+ConversationDict = dict[ConversationKey, object]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_data (
+    user_id    INTEGER PRIMARY KEY,
+    data       TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS user_data_updated_at ON user_data (updated_at);
+CREATE TABLE IF NOT EXISTS conversations (
+    name       TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    state      TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (name, key)
+);
+"""
+
+
+class SQLitePersistence(BasePersistence[dict, dict, dict]):
+    def __init__(self,
+                 path: str | Path,
+                 ttl: float = 900,
+                 max_users: int = 10_000,
+                 update_interval: float = 5):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False,
+                                        user_data=True, callback_data=False),
+            update_interval=update_interval,
+        )
+        self.path = str(path)
+        self.ttl = ttl
+        self.max_users = max_users
+        # one thread owns the connection, so writes are serialised and the
+        # event loop never waits on disk
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="goldenott-state")
+        self._db: sqlite3.Connection | None = None
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(SCHEMA)
+        return self._db
+
+    def _execute(self, sql: str, params: tuple = ()) -> list[tuple]:
+        return self._conn().execute(sql, params).fetchall()
+
+    # ------------------------------------------------------------------
+    # user_data
+    # ------------------------------------------------------------------
+    def _load_users(self) -> dict[int, dict]:
+        rows = self._execute(
+            "SELECT user_id, data FROM user_data WHERE updated_at >= ?"
+            " ORDER BY updated_at DESC LIMIT ?",
+            (time.time() - self.ttl, self.max_users),
+        )
+        return {user_id: json.loads(data) for user_id, data in rows}
+
+    async def get_user_data(self) -> dict[int, dict]:
+        return await self._run(self._load_users)
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        await self._run(
+            self._execute,
+            "INSERT INTO user_data VALUES (?, ?, ?) ON CONFLICT (user_id) DO UPDATE"
+            " SET data = excluded.data, updated_at = excluded.updated_at",
+            (user_id, json.dumps(data, separators=(",", ":")), time.time()),
+        )
+
+    async def drop_user_data(self, user_id: int) -> None:
+        await self._run(self._execute, "DELETE FROM user_data WHERE user_id = ?", (user_id,))
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        pass
+
+    # ------------------------------------------------------------------
+    # conversations
+    # ------------------------------------------------------------------
+    def _load_conversations(self, name: str) -> ConversationDict:
+        self._execute("DELETE FROM conversations WHERE name = ? AND updated_at < ?",
+                      (name, time.time() - self.ttl))
+        rows = self._execute("SELECT key, state FROM conversations WHERE name = ?"
+                             " ORDER BY updated_at DESC LIMIT ?", (name, self.max_users))
+        return {tuple(json.loads(key)): json.loads(state) for key, state in rows}
+
+    async def get_conversations(self, name: str) -> ConversationDict:
+        return await self._run(self._load_conversations, name)
+
+    async def update_conversation(self,
+                                  name: str,
+                                  key: ConversationKey,
+                                  new_state: object | None) -> None:
+        if new_state is None:
+            await self._run(self._execute,
+                            "DELETE FROM conversations WHERE name = ? AND key = ?",
+                            (name, json.dumps(key)))
+            return
+        await self._run(
+            self._execute,
+            "INSERT INTO conversations VALUES (?, ?, ?, ?) ON CONFLICT (name, key) DO UPDATE"
+            " SET state = excluded.state, updated_at = excluded.updated_at",
+            (name, json.dumps(key), json.dumps(new_state), time.time()),
+        )
+
+    # ------------------------------------------------------------------
+    # eviction
+    # ------------------------------------------------------------------
+    def _evictable_users(self) -> set[int]:
+        cutoff = time.time() - self.ttl
+        users = self._execute(
+            "SELECT user_id FROM user_data WHERE updated_at < ?"
+            " UNION SELECT user_id FROM"
+            " (SELECT user_id FROM user_data ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (cutoff, self.max_users),
+        )
+        conversations = self._execute(
+            "SELECT key FROM conversations WHERE updated_at < ?"
+            " UNION SELECT key FROM"
+            " (SELECT key FROM conversations ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (cutoff, self.max_users),
+        )
+        # conversation keys are (chat_id, user_id): the handler is per-user
+        return {uid for (uid,) in users} | {json.loads(key)[-1] for (key,) in conversations}
+
+    async def sweep(self, application: Application) -> int:
+        """Drop idle and over-cap users, and their conversations, from
+        *application* (and, on its next persistence run, from disk); returns
+        how many users were dropped."""
+        evict = await self._run(self._evictable_users)
+        if not evict:
+            return 0
+        for user_id in evict:
+            application.drop_user_data(user_id)
+        # PTB has no public way to end a conversation from outside; deleting
+        # the key from the handler's tracked dict ends it and queues the row
+        # for deletion on the next persistence run
+        for conversations in application._conversation_handler_conversations.values():
+            for key in [key for key in conversations if key[-1] in evict]:
+                del conversations[key]
+        return len(evict)
+
+    async def flush(self) -> None:
+        def close() -> None:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+        await self._run(close)
+
+    # ------------------------------------------------------------------
+    # stores the bot doesn't use
+    # ------------------------------------------------------------------
+    async def get_chat_data(self) -> dict[int, dict]:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self) -> None:
+        return None
+
+    async def update_chat_data(self, chat_id: int, data: dict) -> None:
+        pass
+
+    async def update_bot_data(self, data: dict) -> None:
+        pass
+
+    async def update_callback_data(self, data: object) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data: dict) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data: dict) -> None:
+        pass
@@ -0,0 +1,226 @@
+"""
+Pool of logged-in GoldenOTT sessions.
+
+Every slot is a ``requests.Session`` that stays authenticated between creates,
+so a create only pays for the form-token GET and the POST, over keep-alive
+connections that are already open.  A login that expired upstream (we get
+bounced back to the login form) is noticed on the next request and redone
+transparently.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterator
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from goldenott import metrics
+from goldenott.breaker import CircuitBreaker
+from goldenott.errors import SessionExpired
+from goldenott.limiter import RETRY_STATUSES, SharedLimiter, Slot, backoff, retry_after
+from goldenott.scan import LOGIN_PATHS, is_login_page
+from goldenott.stream import read_until
+
+
+def looks_logged_out(r: requests.Response, check_body: bool = True) -> bool:
+    """True if *r* is the login form instead of the page that was asked for."""
+    if r.history and urlsplit(r.url).path in LOGIN_PATHS:
+        return True
+    if not check_body:
+        return False
+    return is_login_page(r.text)
+
+
+class PooledSession:
+    """One authenticated slot of a :class:`SessionPool`.
+
+    Exposes ``get``/``post`` like ``requests.Session``, plus ``read_until``
+    for streamed bodies, so failures while reading reach the breaker too.
+    """
+
+    def __init__(self, pool: SessionPool, session: requests.Session):
+        self.pool = pool
+        self.session = session
+        self.logged_in_at = 0.0
+        self._authing = False
+
+    def authenticate(self) -> None:
+        self._authing = True
+        try:
+            self.pool.login(self)
+        finally:
+            self._authing = False
+        self.logged_in_at = time.monotonic()
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """One request through the pool's breaker and limiter; GETs are
+        retried with jittered backoff on 429/5xx and transport errors."""
+        attempts = 1 + (self.pool.retries if method.upper() == "GET" else 0)
+        limiter, breaker = self.pool.limiter, self.pool.breaker
+        attempt = 0
+        while True:
+            last = attempt + 1 >= attempts
+            delay = backoff(attempt)
+            if breaker is not None:
+                breaker.check()
+            with limiter.slot() if limiter is not None else nullcontext(Slot()) as slot:
+                try:
+                    r = self.session.request(method, url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    if breaker is not None:
+                        breaker.record(False)
+                    if last:
+                        raise
+                else:
+                    slot.observe(r.status_code)
+                    # a streamed body can still stall: read_until() reports it healthy
+                    if breaker is not None and (r.status_code >= 500 or not kwargs.get("stream")):
+                        breaker.record(r.status_code < 500)
+                    if last or r.status_code not in RETRY_STATUSES:
+                        return r
+                    delay = max(delay, retry_after(r.headers.get("Retry-After")) or 0)
+                    r.close()
+            metrics.UPSTREAM_RETRIES.inc()
+            time.sleep(delay)
+            attempt += 1
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.pool.timeout)
+        r = self._send(method, url, **kwargs)
+        if self._authing or not looks_logged_out(r, check_body=not kwargs.get("stream")):
+            return r
+
+        r.close()
+        self.logged_in_at = 0.0
+        self.authenticate()
+        if method.upper() != "GET":
+            raise SessionExpired(f"{method} {url} bounced to the login form")
+        return self._send(method, url, **kwargs)
+
+    def read_until(self, r: requests.Response, done: Callable[[str], bool]) -> str:
+        """:func:`goldenott.stream.read_until`; a body that stalls or breaks
+        off counts against the breaker like a failed request."""
+        breaker = self.pool.breaker
+        try:
+            text = read_until(r, done)
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError):
+            if breaker is not None:
+                breaker.record(False)
+            raise
+        if breaker is not None:
+            breaker.record(r.status_code < 500)
+        return text
+
+    def relogin_if_logged_out(self, text: str) -> bool:
+        """For a streamed body, which ``request`` can't look into: True, once
+        logged back in, if *text* is the login form and not the page asked for."""
+        if self._authing or not is_login_page(text):
+            return False
+        self.logged_in_at = 0.0
+        self.authenticate()
+        return True
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+class SessionPool:
+    """At most *size* logged-in sessions, handed out one caller at a time.
+
+    *login* is called with a :class:`PooledSession` whenever a slot needs
+    (re-)authenticating.  Requests go through *breaker* and *limiter* when
+    given, and GETs are retried up to *retries* times.
+    """
+
+    def __init__(self,
+                 login: Callable[[PooledSession], None],
+                 size: int = 4,
+                 timeout: float = 30,
+                 limiter: SharedLimiter | None = None,
+                 retries: int = 2,
+                 breaker: CircuitBreaker | None = None):
+        self.login = login
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.limiter = limiter
+        self.retries = retries
+        self.breaker = breaker
+        self._idle: list[PooledSession] = []
+        self._created = 0
+        self._cond = threading.Condition()
+
+    def _new_session(self) -> PooledSession:
+        sess = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        sess.mount("https://", adapter)
+        sess.mount("http://", adapter)
+        return PooledSession(self, sess)
+
+    def acquire(self, prefer: Callable[[PooledSession], bool] | None = None) -> PooledSession:
+        """Check out a logged-in slot, preferring the most recently used one
+        for which *prefer* is true.  Fails fast while the breaker is open."""
+        if self.breaker is not None:
+            self.breaker.check()
+        with self._cond:
+            while not self._idle and self._created >= self.size:
+                self._cond.wait()
+            if self._idle:
+                idx = len(self._idle) - 1
+                if prefer is not None:
+                    idx = next((i for i in range(idx, -1, -1) if prefer(self._idle[i])), idx)
+                ps = self._idle.pop(idx)
+            else:
+                self._created += 1
+                ps = None
+
+        try:
+            if ps is None:
+                ps = self._new_session()
+            if not ps.logged_in_at:
+                ps.authenticate()
+        except BaseException:
+            self.discard(ps)
+            raise
+        return ps
+
+    def release(self, ps: PooledSession) -> None:
+        with self._cond:
+            self._idle.append(ps)
+            self._cond.notify()
+
+    def discard(self, ps: PooledSession | None) -> None:
+        if ps is not None:
+            ps.session.close()
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def session(self, prefer: Callable[[PooledSession], bool] | None = None) -> Iterator[PooledSession]:
+        ps = self.acquire(prefer)
+        try:
+            yield ps
+        finally:
+            self.release(ps)
+
+    def warm(self, each: Callable[[PooledSession], None] | None = None) -> None:
+        """Log every slot in up front so the first creates don't pay for it,
+        optionally running *each* on every slot while it is held."""
+        held: list[PooledSession] = []
+        try:
+            for _ in range(self.size):
+                held.append(self.acquire())
+            if each is not None:
+                for ps in held:
+                    each(ps)
+        finally:
+            for ps in held:
+                self.release(ps)
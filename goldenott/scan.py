@@ -0,0 +1,145 @@
+"""
+Targeted HTML scanning for the handful of things we read off GoldenOTT pages:
+hidden CSRF inputs, the ``div.alert-danger`` block and the logged-in marker.
+
+These are plain ``str.find``/regex scans over the raw text instead of a full
+BeautifulSoup tree, and return the same answers as the
+``select_one(...)`` calls they replace (see bench/bench_parse.py).
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from html import unescape
+from typing import Callable
+
+LOGIN_PATHS = ("/", "/login")          # where an expired session gets redirected
+
+_VALUE_RE = re.compile(r"""\svalue\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.I)
+_ALERT_DANGER_RE = re.compile(
+    r"""<div\b[^>]*?\sclass\s*=\s*(["'])(?:(?!\1).)*?(?<![\w-])alert-danger(?![\w-])[^>]*>""",
+    re.I | re.S,
+)
+_ALERT_SUCCESS_RE = re.compile(
+    r"""<div\b[^>]*?\sclass\s*=\s*(["'])(?:(?!\1).)*?(?<![\w-])alert-success(?![\w-])""",
+    re.I | re.S,
+)
+_DIV_TAG_RE = re.compile(r"<(/?)div\b[^>]*>", re.I)
+_TAG_RE = re.compile(r"<[^>]*>")
+_WS_RE = re.compile(r"\s+")
+_TAKEN_RE = re.compile(r"\busername\b.*?\balready\s+(?:used|taken|exists|in\s+use)", re.I | re.S)
+_CREDITS_RE = re.compile(r"(?:\bnot|n't)\s+(?:have\s+)?enough\s+credits?\b"
+                         r"|\b(?:insufficient|no|out\s+of)\s+credits?\b"
+                         r"|\bcredits?\b.*?\b(?:exhausted|insufficient)\b", re.I | re.S)
+
+
+def input_value(html: str, name: str) -> str | None:
+    """``value`` of the first ``<input name="…">`` (``None`` if there is none)."""
+    for quoted in (f'name="{name}"', f"name='{name}'"):
+        pos = html.find(quoted)
+        while pos != -1:
+            start = html.rfind("<", 0, pos)
+            end = html.find(">", pos)
+            if (html[pos - 1:pos].isspace() and start != -1 and end != -1
+                    and html[start + 1:start + 6].lower() == "input"):
+                m = _VALUE_RE.search(html, start, end + 1)
+                if m is None:
+                    return ""
+                return unescape(next(g for g in m.groups() if g is not None))
+            pos = html.find(quoted, pos + 1)
+    return None
+
+
+def _alert_danger_span(html: str) -> tuple[int, int] | None:
+    """(start, end) of the first ``div.alert-danger``; end is -1 while the
+    block is still unclosed (e.g. a partially received page)."""
+    pos = html.find("alert-danger")
+    if pos == -1:
+        return None
+    m = _ALERT_DANGER_RE.search(html, max(0, html.rfind("<div", 0, pos)))
+    if m is None:
+        return None
+    depth = 1
+    for tag in _DIV_TAG_RE.finditer(html, m.end()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return m.start(), tag.end()
+    return m.start(), -1
+
+
+def find_alert_danger(html: str) -> str | None:
+    """Outer HTML of the first ``div.alert-danger`` (``None`` if there is none)."""
+    span = _alert_danger_span(html)
+    if span is None:
+        return None
+    start, end = span
+    return html[start:end] if end != -1 else html[start:]
+
+
+def text_content(fragment: str) -> str:
+    """Visible text of an HTML fragment, whitespace-collapsed."""
+    return _WS_RE.sub(" ", unescape(_TAG_RE.sub(" ", fragment))).strip()
+
+
+def success_flash(html: str) -> bool:
+    """The ``div.alert-success`` flash GoldenOTT shows after a create."""
+    return "alert-success" in html and _ALERT_SUCCESS_RE.search(html) is not None
+
+
+def logged_in(html: str) -> bool:
+    return "Dashboard" in html or "Logout" in html
+
+
+def is_login_page(html: str) -> bool:
+    """The reseller login form rather than a logged-in page."""
+    return 'name="_csrf_token"' in html and not logged_in(html)
+
+
+def create_settled(html: str) -> bool:
+    """Enough of a create response has arrived to classify it: a complete
+    alert-danger block, the success flash, or the end of the re-rendered
+    form (its ``_token`` input comes after any flash messages)."""
+    span = _alert_danger_span(html)
+    if span is not None:
+        return span[1] != -1
+    return success_flash(html) or input_value(html, "m3u[_token]") is not None
+
+
+def has_input(name: str) -> Callable[[str], bool]:
+    """Stop condition for a page we only read one hidden input from."""
+    return lambda html: input_value(html, name) is not None
+
+
+@dataclass
+class CreateOutcome:
+    ok: bool
+    message: str
+    kind: str                   # "success", "alert_danger" or "unrecognised"
+    timings: dict[str, float] = field(default_factory=dict)   # phase → seconds
+
+
+UNRECOGNISED = ("GoldenOTT sent an unrecognised reply (no success or error message) – "
+                "check the M3U list before trying again")
+
+
+def classify_create(html: str) -> CreateOutcome:
+    """Success only on the success flash; an alert-danger div is the error.
+    Anything else (a form re-rendered with a field error, the login form, a
+    maintenance page) is reported as a failure rather than guessed at."""
+    alert = find_alert_danger(html)
+    if alert is not None:
+        return CreateOutcome(False, text_content(alert), "alert_danger")
+    if success_flash(html):
+        return CreateOutcome(True, "User created successfully!", "success")
+    return CreateOutcome(False, UNRECOGNISED, "unrecognised")
+
+
+def username_taken(message: str) -> bool:
+    """An alert-danger message saying the username is already in use."""
+    return _TAKEN_RE.search(message) is not None
+
+
+def out_of_credits(message: str) -> bool:
+    """An alert-danger message saying the reseller account has no credits left."""
+    return _CREDITS_RE.search(message) is not None
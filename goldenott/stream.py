@@ -0,0 +1,71 @@
+"""
+Read a streamed response only as far as we need to.
+
+``read_until`` / ``aread_until`` decode chunks until ``done(text_so_far)``
+is true, then stop.  If only a little of the body is left it is drained so
+the keep-alive connection can be reused; otherwise the connection is dropped
+instead of downloading the rest of the page.
+"""
+
+from __future__ import annotations
+
+import codecs
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
+CHUNK_SIZE = 8192
+DRAIN_LIMIT = 32 * 1024     # bytes left on the wire we'd rather read than reconnect
+
+
+def _decoder(encoding: str | None) -> codecs.IncrementalDecoder:
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+def _worth_draining(content_length: str | None, consumed: int) -> bool:
+    try:
+        return int(content_length) - consumed <= DRAIN_LIMIT
+    except (TypeError, ValueError):
+        return False
+
+
+def read_until(r: requests.Response, done: Callable[[str], bool]) -> str:
+    """Text of *r* (sent with ``stream=True``) up to the chunk where *done*
+    first holds, or all of it."""
+    decode = _decoder(r.encoding).decode
+    text = ""
+    try:
+        chunks = r.iter_content(CHUNK_SIZE)
+        for chunk in chunks:
+            text += decode(chunk)
+            if done(text):
+                if _worth_draining(r.headers.get("Content-Length"), r.raw.tell()):
+                    for _ in chunks:
+                        pass
+                return text
+        return text + decode(b"", final=True)
+    finally:
+        r.close()
+
+
+async def aread_until(r: httpx.Response, done: Callable[[str], bool]) -> str:
+    """Async twin of :func:`read_until` for a response from ``client.stream()``."""
+    decode = _decoder(r.encoding).decode
+    text = ""
+    try:
+        chunks = r.aiter_bytes(CHUNK_SIZE)
+        async for chunk in chunks:
+            text += decode(chunk)
+            if done(text):
+                if _worth_draining(r.headers.get("Content-Length"), r.num_bytes_downloaded):
+                    async for _ in chunks:
+                        pass
+                return text
+        return text + decode(b"", final=True)
+    finally:
+        await r.aclose()
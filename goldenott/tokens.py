@@ -0,0 +1,98 @@
+"""
+Pre-fetched ``m3u[_token]`` values for the create form.
+
+A token belongs to the login it was issued under, so tokens are cached per
+pooled session and dropped as soon as that session logs in again.  A
+background thread refills the cache after every create, which keeps the form
+download and parse off the user-visible path.
+"""
+
+from __future__ import annotations
+
+import queue
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from goldenott.pool import PooledSession, SessionPool
+
+CSRF_REJECTED = re.compile(r"CSRF token is invalid", re.I)
+
+
+def csrf_rejected(html: str) -> bool:
+    """True if the create POST bounced on a stale/invalid form token."""
+    return CSRF_REJECTED.search(html) is not None
+
+
+class FormTokenCache:
+    """Hands out create-form tokens for pooled sessions, fetching ahead of time."""
+
+    def __init__(self,
+                 pool: SessionPool,
+                 fetch: Callable[[PooledSession], str],
+                 max_age: float = 600):
+        self.pool = pool
+        self.fetch = fetch
+        self.max_age = max_age
+        self._tokens: dict[PooledSession, tuple[str, float, float]] = {}
+        self._lock = threading.Lock()
+        self._jobs: queue.Queue[None] = queue.Queue()
+        self._worker: threading.Thread | None = None
+
+    def is_fresh(self, ps: PooledSession) -> bool:
+        with self._lock:
+            entry = self._tokens.get(ps)
+        if entry is None:
+            return False
+        _, fetched_at, login_at = entry
+        return login_at == ps.logged_in_at and time.monotonic() - fetched_at < self.max_age
+
+    def take(self, ps: PooledSession) -> str:
+        """Cached token for *ps* if still good, otherwise fetch one now."""
+        fresh = self.is_fresh(ps)
+        with self._lock:
+            entry = self._tokens.pop(ps, None)
+        if fresh and entry is not None:
+            return entry[0]
+        return self.fetch(ps)
+
+    def prefetch(self, ps: PooledSession) -> None:
+        token = self.fetch(ps)
+        with self._lock:
+            self._tokens[ps] = (token, time.monotonic(), ps.logged_in_at)
+
+    # ------------------------------------------------------------------
+    # background refill
+    # ------------------------------------------------------------------
+    def refill(self, count: int = 1) -> None:
+        """Queue *count* background fetches for sessions without a token."""
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="goldenott-tokens", daemon=True)
+            self._worker.start()
+        for _ in range(count):
+            self._jobs.put(None)
+
+    def warm(self) -> None:
+        """Log in every pooled session and give each a token, in the background."""
+        def run() -> None:
+            try:
+                self.pool.warm(each=self._prefetch_stale)
+            except Exception as exc:
+                print("[WARN] session warm-up failed:", exc)
+
+        threading.Thread(target=run, name="goldenott-warm", daemon=True).start()
+
+    def _prefetch_stale(self, ps: PooledSession) -> None:
+        if not self.is_fresh(ps):
+            self.prefetch(ps)
+
+    def _run(self) -> None:
+        while True:
+            self._jobs.get()
+            try:
+                with self.pool.session(prefer=lambda ps: not self.is_fresh(ps)) as ps:
+                    self._prefetch_stale(ps)
+            except Exception as exc:
+                print("[WARN] form-token prefetch failed:", exc)
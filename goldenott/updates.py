@@ -0,0 +1,73 @@
+"""
+Concurrent Telegram update processing that keeps each chat in order.
+
+Plugged into ``Application.builder().concurrent_updates(...)`` by bot.py:
+updates from different chats run side by side (up to
+*max_concurrent_updates*), while updates from the same chat wait on that
+chat's lock, so a conversation still sees username → password → country →
+adult in the order the user sent them.  ``asyncio.Lock`` wakes waiters
+first-come first-served, which keeps arrival order within a chat.
+
+PTB's own semaphore is taken before ``do_process_update`` runs, so updates
+queued behind a busy chat would hold global slots while they wait.  The
+base class therefore gets an effectively unbounded limit, and the real one
+is a second semaphore taken only once the chat's lock is held.
+"""
+
+from __future__ import annotations
+
+import sys
+from asyncio import Lock, Semaphore
+from typing import Any, Awaitable
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+def _chat_key(update: object) -> int | None:
+    if not isinstance(update, Update):
+        return None
+    if update.effective_chat is not None:
+        return update.effective_chat.id
+    if update.effective_user is not None:
+        return update.effective_user.id
+    return None
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    __slots__ = ("_locks", "_running", "limit")
+
+    def __init__(self, max_concurrent_updates: int = 256):
+        if max_concurrent_updates < 1:
+            raise ValueError("`max_concurrent_updates` must be a positive integer!")
+        super().__init__(sys.maxsize)
+        self.limit = max_concurrent_updates
+        self._running = Semaphore(max_concurrent_updates)   # slots for updates actually running
+        self._locks: dict[int, tuple[Lock, int]] = {}     # chat → (lock, updates holding/awaiting it)
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = _chat_key(update)
+        if key is None:
+            async with self._running:
+                await coroutine
+            return
+
+        lock, users = self._locks.get(key, (None, 0))
+        if lock is None:
+            lock = Lock()
+        self._locks[key] = (lock, users + 1)
+        try:
+            async with lock, self._running:
+                await coroutine
+        finally:
+            lock, users = self._locks[key]
+            if users == 1:
+                del self._locks[key]
+            else:
+                self._locks[key] = (lock, users - 1)
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass